@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+管理后台索引基准测试
+
+在同一份数据上分别测量“原始索引”（只有外键索引）和“当前索引”（models.py 中的 Meta.indexes）
+两种情况下，ProductAdmin / CustomerAdmin 变更列表页面及其分页查询的耗时。
+
+用法:
+    python benchmarks/bench_admin_indexes.py --products 1000000
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import timedelta
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import admin_client, ensure_dataset, setup_django, summarize, timed
+
+setup_django()
+
+from django.db import connection, models
+from django.utils import timezone
+
+from sample_data.models import Category, Product, Customer
+
+# 迁移 0003 之前 Product.category 外键自带的单列索引
+BASELINE_INDEXES = {
+    Product: [models.Index(fields=['category'], name='bench_product_category_idx')],
+    Customer: [],
+}
+
+
+def build_cases():
+    """返回 [(名称, 变更列表 URL, 等价的分页查询), ...]"""
+    category_id = Category.objects.order_by('id').values_list('id', flat=True).first()
+    week_ago = timezone.localtime() - timedelta(days=7)
+
+    products = Product.objects.order_by('-created_at', '-pk')
+    customers = Customer.objects.order_by('-date_joined', '-pk')
+    return [
+        ('产品列表', '/admin/sample_data/product/',
+         products),
+        ('产品 按状态', '/admin/sample_data/product/?status__exact=out_of_stock',
+         products.filter(status='out_of_stock')),
+        ('产品 按分类', f'/admin/sample_data/product/?category__id__exact={category_id}',
+         products.filter(category_id=category_id)),
+        ('产品 按分类+状态',
+         f'/admin/sample_data/product/?category__id__exact={category_id}&status__exact=available',
+         products.filter(category_id=category_id, status='available')),
+        ('产品 最近7天', '/admin/sample_data/product/?' + urlencode({'created_at__gte': str(week_ago)}),
+         products.filter(created_at__gte=week_ago)),
+        ('客户列表', '/admin/sample_data/customer/',
+         customers),
+        ('客户 最近7天', '/admin/sample_data/customer/?' + urlencode({'date_joined__gte': str(week_ago)}),
+         customers.filter(date_joined__gte=week_ago)),
+    ]
+
+
+def set_indexes(current):
+    """current=True 时恢复 Meta.indexes，否则换成迁移前的索引"""
+    with connection.schema_editor() as editor:
+        for model in (Product, Customer):
+            add, remove = model._meta.indexes, BASELINE_INDEXES[model]
+            if not current:
+                add, remove = remove, add
+            for index in remove:
+                editor.execute(f'DROP INDEX IF EXISTS {editor.quote_name(index.name)}')
+            for index in add:
+                editor.add_index(model, index)
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+
+def run_cases(client, cases, repeat):
+    results = {}
+    for name, url, queryset in cases:
+        page = timed(lambda: client.get(url), repeat=repeat)
+        query = timed(lambda: list(queryset[:100]), repeat=repeat)
+        results[name] = {'page': summarize(page), 'query': summarize(query)}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="管理后台索引基准测试")
+    parser.add_argument('--products', type=int, default=1000000, help="产品数量（默认 100 万）")
+    parser.add_argument('--repeat', type=int, default=5, help="每个用例重复次数")
+    parser.add_argument('--output', help="把结果写入 JSON 文件")
+    parser.add_argument('--yes', action='store_true', help="数据不符时直接清空并重新生成，不询问确认")
+    args = parser.parse_args(argv)
+
+    ensure_dataset(args.products, assume_yes=args.yes)
+    cases = build_cases()
+
+    with admin_client() as client:
+        print("\n测量迁移前的索引...")
+        set_indexes(current=False)
+        try:
+            before = run_cases(client, cases, args.repeat)
+        finally:
+            print("恢复当前索引...")
+            set_indexes(current=True)
+        after = run_cases(client, cases, args.repeat)
+
+    print(f"\n{'用例':<16}{'页面 前/后 (p50 ms)':>24}{'查询 前/后 (p50 ms)':>24}")
+    for name, _, _ in cases:
+        b, a = before[name], after[name]
+        print(f"{name:<16}"
+              f"{b['page']['p50_ms']:>12.1f} / {a['page']['p50_ms']:<9.1f}"
+              f"{b['query']['p50_ms']:>12.1f} / {a['query']['p50_ms']:<9.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump({'products': args.products, 'vendor': connection.vendor,
+                       'before': before, 'after': after}, fh, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+"""
+WSGI 与 ASGI 吞吐量对比
+
+分别启动两个服务器进程，用同一组并发客户端请求相同的数据：
+
+- wsgi: config/wsgi.py，固定大小的线程池（与 gunicorn --threads 相同），请求同步接口 /api/...
+- asgi: config/asgi.py，单个 uvicorn worker，请求异步接口 /api/async/...
+
+每个客户端连接可以模拟慢速客户端：先发送请求行，等待 --slow-ms 毫秒后再发送其余请求头。
+WSGI 的线程在等待期间被占住，并发连接数超过线程数后请求开始排队；ASGI 的事件循环
+在等待期间可以继续处理其他连接。
+
+报告每秒请求数、p50 / p99 延迟和失败数。默认关闭 API 缓存（每个请求都查询数据库），
+两个服务器都使用持久连接（DB_PROFILE=production）。需要安装 uvicorn。
+
+用法:
+    python benchmarks/bench_asgi.py --connections 64 --threads 8 --duration 5
+    python benchmarks/bench_asgi.py --connections 256 --slow-ms 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.common import ensure_dataset, make_wsgi_server, setup_django, summarize
+
+SERVERS = ('wsgi', 'asgi')
+HOST = '127.0.0.1'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def serve_wsgi(port, threads):
+    """--serve-wsgi 模式：在当前进程中运行 WSGI 服务器"""
+    setup_django()
+    server = make_wsgi_server(threads, HOST, port)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def start_server(kind, port, threads, env):
+    if kind == 'wsgi':
+        command = [sys.executable, os.path.abspath(__file__), '--serve-wsgi',
+                   '--port', str(port), '--threads', str(threads)]
+    else:
+        command = [sys.executable, '-m', 'uvicorn', 'config.asgi:application',
+                   '--host', HOST, '--port', str(port), '--workers', '1',
+                   '--log-level', 'warning', '--no-access-log']
+    process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{kind} 服务器启动失败（退出码 {process.returncode}）")
+        try:
+            socket.create_connection((HOST, port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"{kind} 服务器 30 秒内没有开始监听")
+
+
+async def fetch(port, path, slow):
+    """发送一个 HTTP/1.1 GET 请求，返回状态码"""
+    reader, writer = await asyncio.open_connection(HOST, port)
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\n'.encode())
+        if slow:
+            await writer.drain()
+            await asyncio.sleep(slow)
+        writer.write(f'Host: localhost\r\nConnection: close\r\n\r\n'.encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def run_clients(port, paths, connections, duration, slow):
+    latencies = []
+    failures = [0]
+    stop = time.perf_counter() + duration
+
+    async def client(offset):
+        i = offset
+        while time.perf_counter() < stop:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                status = await fetch(port, path, slow)
+            except (OSError, ValueError, IndexError):
+                status = None
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                failures[0] += 1
+
+    began = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(connections)))
+    elapsed = time.perf_counter() - began
+    return {
+        'connections': connections,
+        'requests': len(latencies),
+        'failures': failures[0],
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'latency': summarize(latencies),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WSGI 与 ASGI 吞吐量对比")
+    parser.add_argument('--products', type=int, default=10000, help="产品数量（默认 1 万）")
+    parser.add_argument('--connections', type=int, default=64, help="并发客户端连接数")
+    parser.add_argument('--threads', type=int, default=8, help="WSGI 服务器的线程数")
+    parser.add_argument('--duration', type=float, default=5.0, help="每个服务器的测试时间（秒）")
+    parser.add_argument('--slow-ms', type=float, default=0, help="慢速客户端在请求行和请求头之间等待的毫秒数")
+    parser.add_argument('--cache', action='store_true', help="开启 API 缓存")
+    parser.add_argument('--servers', nargs='+', choices=SERVERS, default=list(SERVERS))
+    parser.add_argument('--output', help="把结果写入 JSON 文件")
+    parser.add_argument('--yes', action='store_true', help="数据不符时直接清空并重新生成，不询问确认")
+    parser.add_argument('--serve-wsgi', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve_wsgi:
+        serve_wsgi(args.port, args.threads)
+        return
+
+    setup_django()
+    from django.db import connection
+    from sample_data.models import Category, Product
+
+    ensure_dataset(args.products, assume_yes=args.yes)
+    product_ids = list(Product.objects.order_by('id').values_list('id', flat=True)[:2000:50])
+    category_id = Category.objects.values_list('id', flat=True).first()
+    connection.close()
+
+    paths = ['/products/?limit=20', '/products/?order=updated_at&limit=20', '/categories/stats/',
+             f'/categories/{category_id}/']
+    paths += [f'/products/{pk}/' for pk in product_ids]
+
+    env = {**os.environ, 'DB_PROFILE': 'production', 'DJANGO_SETTINGS_MODULE': 'config.settings',
+           'QUERY_LOG_LEVEL': 'ERROR'}
+    if not args.cache:
+        env['DJANGO_CACHE_BACKEND'] = 'django.core.cache.backends.dummy.DummyCache'
+
+    results = {}
+    for kind in args.servers:
+        prefix = '/api' if kind == 'wsgi' else '/api/async'
+        port = free_port()
+        print(f"运行 {kind}（{args.connections} 个连接，{args.duration:g} 秒）...")
+        try:
+            server = start_server(kind, port, args.threads, env)
+        except RuntimeError as e:
+            print(f"  ✗ {e}")
+            continue
+        try:
+            results[kind] = asyncio.run(run_clients(
+                port, [prefix + path for path in paths], args.connections,
+                args.duration, args.slow_ms / 1000,
+            ))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"\n{'服务器':<8}{'请求/秒':>10}{'p50 ms':>10}{'p99 ms':>10}{'失败':>8}")
+    for kind, r in results.items():
+        print(f"{kind:<8}{r['requests_per_second']:>10.0f}{r['latency']['p50_ms']:>10.2f}"
+              f"{r['latency']['p99_ms']:>10.2f}{r['failures']:>8}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump({'products': args.products, 'threads': args.threads, 'slow_ms': args.slow_ms,
+                       'cache': args.cache, 'results': results}, fh, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
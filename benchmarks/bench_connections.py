@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+"""
+数据库连接方式基准测试
+
+在子进程中依次使用不同的连接配置（见 sample_data/database.py）启动 WSGI 服务器，
+由固定大小的线程池处理请求（与 gunicorn 的 gthread worker 相同；runserver 每个请求新建一个线程，
+数据库连接是线程本地的，持久连接无法复用），多个客户端线程通过 HTTP 持续请求 JSON API，比较：
+
+- per-request: DB_PROFILE=development，每个请求结束时关闭连接
+- persistent: DB_PROFILE=production，持久连接 + 健康检查
+- pool: DB_PROFILE=production DB_POOL=1，Django 的 psycopg 连接池（仅 PostgreSQL）
+
+报告每秒请求数、p50 / p99 延迟和新建的数据库连接数。API 缓存在测试期间关闭，每个请求都会查询数据库。
+（Django 的测试客户端会跳过请求结束时关闭连接的逻辑，所以这里必须走真实的 HTTP 请求。）
+
+用法:
+    python benchmarks/bench_connections.py --threads 8 --duration 5
+    DB_ENGINE=postgresql DB_NAME=sample_data_bench python benchmarks/bench_connections.py --yes
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import ensure_dataset, make_wsgi_server, setup_django, summarize
+
+CONFIGS = {
+    'per-request': {'DB_PROFILE': 'development', 'DB_POOL': ''},
+    'persistent': {'DB_PROFILE': 'production', 'DB_POOL': ''},
+    'pool': {'DB_PROFILE': 'production', 'DB_POOL': '1'},
+}
+NO_CACHE_ALIAS = 'bench-nocache'
+
+
+def run_load(threads, duration):
+    """在当前进程中（使用当前环境变量的连接配置）运行负载，返回结果字典"""
+    setup_django()
+
+    from django.conf import settings
+    from django.db import connection
+    from django.db.backends.signals import connection_created
+    from django.test import override_settings
+
+    from sample_data.models import Product
+
+    ids = list(Product.objects.order_by('id').values_list('id', flat=True)[:1000])
+    urls = ['/api/products/?limit=20', '/api/categories/stats/']
+    urls += [f'/api/products/{pk}/' for pk in ids[::100]]
+    connection.close()
+
+    lock = threading.Lock()
+    opened = [0]
+    latencies = []
+    errors = [0]
+
+    def count_connection(sender, **kwargs):
+        with lock:
+            opened[0] += 1
+
+    connection_created.connect(count_connection)
+    stop = threading.Event()
+    barrier = threading.Barrier(threads + 1)
+
+    server = make_wsgi_server(threads)
+    base = f'http://127.0.0.1:{server.server_port}'
+
+    def worker(offset):
+        samples = []
+        failures = 0
+        barrier.wait()
+        i = offset
+        while not stop.is_set():
+            url = urls[i % len(urls)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                with urlopen(base + url) as response:
+                    response.read()
+            except HTTPError:
+                failures += 1
+            samples.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(samples)
+            errors[0] += failures
+
+    caches = {**settings.CACHES, NO_CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    with override_settings(CACHES=caches, API_CACHE_ALIAS=NO_CACHE_ALIAS):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        for thread in pool:
+            thread.start()
+        barrier.wait()
+        began = time.perf_counter()
+        time.sleep(duration)
+        stop.set()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - began
+        server.shutdown()
+        server.server_close()
+
+    database = settings.DATABASES['default']
+    return {
+        'vendor': connection.vendor,
+        'conn_max_age': database['CONN_MAX_AGE'],
+        'pool': database['OPTIONS'].get('pool'),
+        'threads': threads,
+        'requests': len(latencies),
+        'errors': errors[0],
+        'connections_opened': opened[0],
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'latency': summarize(latencies),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="数据库连接方式基准测试")
+    parser.add_argument('--products', type=int, default=10000, help="产品数量（默认 1 万）")
+    parser.add_argument('--threads', type=int, default=8, help="并发线程数")
+    parser.add_argument('--duration', type=float, default=5.0, help="每种配置的持续时间（秒）")
+    parser.add_argument('--configs', nargs='+', choices=list(CONFIGS), help="默认测试当前数据库支持的全部配置")
+    parser.add_argument('--output', help="把结果写入 JSON 文件")
+    parser.add_argument('--yes', action='store_true', help="数据不符时直接清空并重新生成，不询问确认")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        json.dump(run_load(args.threads, args.duration), sys.stdout)
+        return
+
+    setup_django()
+    from django.db import connection
+
+    ensure_dataset(args.products, assume_yes=args.yes)
+    configs = args.configs or [name for name in CONFIGS if name != 'pool' or connection.vendor == 'postgresql']
+    connection.close()
+
+    results = {}
+    for name in configs:
+        print(f"运行 {name}（{args.threads} 个线程，{args.duration:g} 秒）...")
+        env = {**os.environ, **CONFIGS[name]}
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker',
+             '--threads', str(args.threads), '--duration', str(args.duration)],
+            env=env, capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            print(f"  ✗ {name} 运行失败:\n{completed.stderr}")
+            continue
+        results[name] = json.loads(completed.stdout)
+
+    print(f"\n{'配置':<14}{'请求/秒':>10}{'p50 ms':>10}{'p99 ms':>10}{'新建连接':>10}{'错误':>8}")
+    for name, r in results.items():
+        print(f"{name:<14}{r['requests_per_second']:>10.0f}{r['latency']['p50_ms']:>10.2f}"
+              f"{r['latency']['p99_ms']:>10.2f}{r['connections_opened']:>10}{r['errors']:>8}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump({'products': args.products, 'results': results}, fh, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
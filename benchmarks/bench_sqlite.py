@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""
+SQLite 连接调优基准测试
+
+依次使用 sample_data/sqlite.py 中的各个配置（default: SQLite 默认值，tuned: WAL 等）运行：
+
+- commits: 单线程逐条提交小事务（每次提交在 synchronous=FULL 下都要 fsync）
+- mixed: 若干读线程翻页读取产品列表，同时若干写线程像管理后台那样在事务中先读出产品再 save()
+
+报告每秒提交数、读写吞吐量、p50 / p99 延迟，以及 "database is locked" 错误数。
+
+用法:
+    python benchmarks/bench_sqlite.py --readers 8 --writers 4 --duration 5
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import ensure_dataset, setup_django, summarize
+
+setup_django()
+
+from django.conf import settings
+from django.db import OperationalError, connection, connections, transaction
+from django.utils import timezone
+
+from sample_data.models import Product
+from sample_data.sqlite import current_pragmas, database_options
+
+PROFILES = ('default', 'tuned')
+PAGE_SIZE = 50
+
+
+def use_profile(profile):
+    """关闭现有连接并切换配置，之后新建的连接（包括各线程的连接）使用新的 PRAGMA 和 OPTIONS"""
+    connections.close_all()
+    settings.SQLITE_PROFILE = profile
+    connections.settings['default']['OPTIONS'] = database_options(profile)
+    return current_pragmas(connection)
+
+
+def run_commits(ids, count):
+    samples = []
+    for _ in range(count):
+        pk = random.choice(ids)
+        start = time.perf_counter()
+        Product.objects.filter(pk=pk).update(updated_at=timezone.now())
+        samples.append(time.perf_counter() - start)
+    elapsed = sum(samples)
+    return {
+        'commits': count,
+        'commits_per_second': round(count / elapsed, 1) if elapsed else 0.0,
+        'latency': summarize(samples),
+    }
+
+
+def read_page(ids):
+    after = random.choice(ids)
+    list(Product.objects.filter(pk__gt=after).order_by('pk').values(
+        'id', 'name', 'price', 'stock_quantity', 'status', 'category__name',
+    )[:PAGE_SIZE])
+
+
+def write_product(ids):
+    with transaction.atomic():
+        product = Product.objects.get(pk=random.choice(ids))
+        product.save()
+
+
+def run_mixed(ids, readers, writers, duration):
+    lock = threading.Lock()
+    results = {
+        'read': {'ops': 0, 'errors': 0, 'samples': []},
+        'write': {'ops': 0, 'errors': 0, 'samples': []},
+    }
+    stop = threading.Event()
+    barrier = threading.Barrier(readers + writers + 1)
+
+    def worker(kind, operation):
+        samples = []
+        ops = errors = 0
+        barrier.wait()
+        try:
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    operation(ids)
+                except OperationalError:
+                    errors += 1
+                    continue
+                samples.append(time.perf_counter() - start)
+                ops += 1
+        finally:
+            connection.close()
+        with lock:
+            results[kind]['ops'] += ops
+            results[kind]['errors'] += errors
+            results[kind]['samples'].extend(samples)
+
+    pool = [threading.Thread(target=worker, args=('read', read_page)) for _ in range(readers)]
+    pool += [threading.Thread(target=worker, args=('write', write_product)) for _ in range(writers)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    began = time.perf_counter()
+    time.sleep(duration)
+    stop.set()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    report = {'readers': readers, 'writers': writers, 'elapsed_s': round(elapsed, 3)}
+    for kind, r in results.items():
+        report[kind] = {
+            'ops': r['ops'],
+            'errors': r['errors'],
+            'ops_per_second': round(r['ops'] / elapsed, 1),
+            'latency': summarize(r['samples']),
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite 连接调优基准测试")
+    parser.add_argument('--products', type=int, default=100000, help="产品数量（默认 10 万）")
+    parser.add_argument('--commits', type=int, default=500, help="commits 场景的事务数")
+    parser.add_argument('--readers', type=int, default=8, help="读线程数")
+    parser.add_argument('--writers', type=int, default=4, help="写线程数")
+    parser.add_argument('--duration', type=float, default=5.0, help="mixed 场景的持续时间（秒）")
+    parser.add_argument('--profiles', nargs='+', choices=PROFILES, default=list(PROFILES))
+    parser.add_argument('--output', help="把结果写入 JSON 文件")
+    parser.add_argument('--yes', action='store_true', help="数据不符时直接清空并重新生成，不询问确认")
+    args = parser.parse_args(argv)
+
+    if connection.vendor != 'sqlite':
+        parser.error(f"当前数据库是 {connection.vendor}，该基准只适用于 SQLite")
+
+    original = settings.SQLITE_PROFILE
+    ensure_dataset(args.products, assume_yes=args.yes)
+    ids = list(Product.objects.values_list('id', flat=True))
+
+    results = {}
+    try:
+        for profile in args.profiles:
+            pragmas = use_profile(profile)
+            print(f"运行 {profile}（journal_mode={pragmas['journal_mode']}, synchronous={pragmas['synchronous']}）...")
+            results[profile] = {
+                'pragmas': pragmas,
+                'commits': run_commits(ids, args.commits),
+                'mixed': run_mixed(ids, args.readers, args.writers, args.duration),
+            }
+    finally:
+        use_profile(original)
+
+    print(f"\n{'配置':<10}{'提交/秒':>10}{'读/秒':>10}{'读 p99 ms':>12}{'写/秒':>10}{'写 p99 ms':>12}{'锁错误':>10}")
+    for profile, r in results.items():
+        mixed = r['mixed']
+        print(f"{profile:<10}{r['commits']['commits_per_second']:>10.0f}"
+              f"{mixed['read']['ops_per_second']:>10.0f}{mixed['read']['latency'].get('p99_ms', 0):>12.2f}"
+              f"{mixed['write']['ops_per_second']:>10.0f}{mixed['write']['latency'].get('p99_ms', 0):>12.2f}"
+              f"{mixed['read']['errors'] + mixed['write']['errors']:>10}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump({'products': args.products, 'results': results}, fh, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""
+库存预留并发基准测试
+
+多个线程同时抢购同一个热门产品，直到库存耗尽，比较三种做法：
+
+- naive: 读出产品、检查库存、修改后 save()（管理后台的方式）
+- reserve: stock.reserve()，一条带条件的 UPDATE
+- reserve_many: stock.reserve_many()，每个订单包含热门产品和另外两个产品
+
+报告吞吐量、单次调用延迟，以及是否超卖（成功件数大于初始库存）或丢失更新
+（数据库中扣减的库存与成功件数不一致）。
+
+用法:
+    python benchmarks/bench_stock.py --threads 32 --stock 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import ensure_dataset, setup_django, summarize
+
+setup_django()
+
+from django.db import OperationalError, connection
+
+from sample_data import stock
+from sample_data.models import Product
+
+SCENARIOS = ('naive', 'reserve', 'reserve_many')
+
+
+def naive_reserve(product_id, quantity):
+    """读-改-写：两个线程可能读到同一个库存值"""
+    product = Product.objects.get(pk=product_id)
+    if product.status != 'available' or product.stock_quantity < quantity:
+        return False
+    product.stock_quantity -= quantity
+    if product.stock_quantity == 0:
+        product.status = 'out_of_stock'
+    product.save()
+    return True
+
+
+def make_attempt(scenario, hot_id, other_ids, quantity):
+    if scenario == 'naive':
+        return lambda: naive_reserve(hot_id, quantity)
+    if scenario == 'reserve':
+        return lambda: stock.reserve(hot_id, quantity)
+    order = {hot_id: quantity, **{pk: 1 for pk in other_ids}}
+    return lambda: not stock.reserve_many(order)
+
+
+def set_stock(product_ids, quantity):
+    Product.objects.filter(pk__in=product_ids).update(stock_quantity=quantity, status='available')
+
+
+def run_scenario(scenario, hot_id, other_ids, threads, initial_stock, quantity):
+    set_stock([hot_id], initial_stock)
+    # 其他产品库存充足，订单只会因为热门产品缺货而失败
+    set_stock(other_ids, initial_stock * threads)
+    attempt = make_attempt(scenario, hot_id, other_ids, quantity)
+
+    lock = threading.Lock()
+    latencies = []
+    counts = {'success': 0, 'errors': 0}
+    barrier = threading.Barrier(threads)
+
+    def worker():
+        local_latencies = []
+        success = errors = 0
+        barrier.wait()
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    ok = attempt()
+                except OperationalError:
+                    # SQLite 上写锁等待超时（database is locked）
+                    errors += 1
+                    continue
+                finally:
+                    local_latencies.append(time.perf_counter() - start)
+                if not ok:
+                    break
+                success += 1
+        finally:
+            connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            counts['success'] += success
+            counts['errors'] += errors
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    began = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    product = Product.objects.get(pk=hot_id)
+    reserved = counts['success'] * quantity
+    return {
+        'threads': threads,
+        'initial_stock': initial_stock,
+        'successful_reservations': counts['success'],
+        'errors': counts['errors'],
+        'final_stock': product.stock_quantity,
+        'final_status': product.status,
+        'oversold': max(0, reserved - initial_stock),
+        'lost_updates': reserved - (initial_stock - product.stock_quantity),
+        'elapsed_s': round(elapsed, 3),
+        'reservations_per_second': round(counts['success'] / elapsed, 1) if elapsed else 0.0,
+        'latency': summarize(latencies),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="库存预留并发基准测试")
+    parser.add_argument('--products', type=int, default=10000, help="产品数量（默认 1 万）")
+    parser.add_argument('--threads', type=int, default=16, help="并发线程数")
+    parser.add_argument('--stock', type=int, default=2000, help="热门产品的初始库存")
+    parser.add_argument('--quantity', type=int, default=1, help="每次预留的件数")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--output', help="把结果写入 JSON 文件")
+    parser.add_argument('--yes', action='store_true', help="数据不符时直接清空并重新生成，不询问确认")
+    args = parser.parse_args(argv)
+
+    ensure_dataset(args.products, assume_yes=args.yes)
+    ids = list(Product.objects.order_by('id').values_list('id', flat=True)[:3])
+    hot_id, other_ids = ids[0], ids[1:]
+    original = {
+        pk: (qty, status)
+        for pk, qty, status in Product.objects.filter(pk__in=ids).values_list('id', 'stock_quantity', 'status')
+    }
+
+    results = {}
+    try:
+        for scenario in args.scenarios:
+            print(f"运行 {scenario}（{args.threads} 个线程，库存 {args.stock}）...")
+            results[scenario] = run_scenario(
+                scenario, hot_id, other_ids, args.threads, args.stock, args.quantity,
+            )
+    finally:
+        for pk, (qty, status) in original.items():
+            Product.objects.filter(pk=pk).update(stock_quantity=qty, status=status)
+
+    print(f"\n{'方式':<14}{'成功':>8}{'超卖':>8}{'丢失更新':>10}{'错误':>8}{'次/秒':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for scenario, r in results.items():
+        print(f"{scenario:<14}{r['successful_reservations']:>8}{r['oversold']:>8}{r['lost_updates']:>10}"
+              f"{r['errors']:>8}{r['reservations_per_second']:>10.0f}"
+              f"{r['latency']['p50_ms']:>10.2f}{r['latency']['p99_ms']:>10.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump({'products': args.products, 'vendor': connection.vendor, 'results': results},
+                      fh, ensure_ascii=False, indent=2)
+        print(f"\n结果已写入 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
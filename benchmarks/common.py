@@ -0,0 +1,193 @@
+"""
+基准测试公共工具
+
+各基准脚本先调用 setup_django()，再按需导入模型和其他模块。
+
+使用 SQLite 且没有设置 DB_NAME 时，基准测试使用单独的数据库文件
+benchmarks/bench.sqlite3（自动迁移），不会改动开发数据库。显式指定了数据库
+（DB_NAME 或 PostgreSQL）时，ensure_dataset() 在清空数据前要求确认，
+各脚本的 --yes 参数跳过确认。
+"""
+
+import os
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+
+import django
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+BENCH_DATABASE = os.path.join(project_root, 'benchmarks', 'bench.sqlite3')
+
+
+def setup_django(settings_module='config.settings'):
+    """设置Django环境；SQLite 默认使用基准测试专用的数据库（子进程通过环境变量继承）"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    if os.environ.get('DB_ENGINE', 'sqlite') == 'sqlite':
+        os.environ.setdefault('DB_NAME', BENCH_DATABASE)
+    django.setup()
+    if is_bench_database():
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0, interactive=False)
+
+
+def is_bench_database():
+    from django.conf import settings
+
+    return str(settings.DATABASES['default']['NAME']) == BENCH_DATABASE
+
+
+def percentile(samples, pct):
+    """最近秩法求百分位数"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def summarize(samples):
+    """把耗时样本（秒）汇总为毫秒统计"""
+    if not samples:
+        return {'runs': 0}
+    return {
+        'runs': len(samples),
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 3),
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'min_ms': round(min(samples) * 1000, 3),
+    }
+
+
+def timed(fn, repeat=5, warmup=1):
+    """调用 fn 若干次，返回每次的耗时（秒）"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def seed_dataset(products, batch_size=5000, seed=None, verbose=True):
+    """
+    清空样本数据表后合成 products 个产品（以及相应的分类和客户）
+
+    返回 {模型键名: BulkInsertResult}。
+    """
+    from sample_data import synth
+    from sample_data.bulk import bulk_insert
+    from sample_data.models import Category, Product, Customer
+    from sample_data.reset import reset_tables
+    from sample_data.stats import rebuild_category_stats
+
+    seed = synth.DEFAULT_SEED if seed is None else seed
+    categories = max(len(synth.BASE_CATEGORIES), products // 1000)
+    customers = products // 2
+    if verbose:
+        print(f"准备数据集: {categories} 个分类、{products} 个产品、{customers} 个客户...")
+
+    reset_tables(verbose=False)
+    results = {}
+    results['categories'] = bulk_insert(Category, synth.iter_categories(categories, batch_size, seed),
+                                        batch_size=batch_size, verbose=verbose)
+    category_ids = list(Category.objects.order_by('id').values_list('id', flat=True))
+    results['products'] = bulk_insert(Product, synth.iter_products(products, category_ids, batch_size, seed),
+                                      batch_size=batch_size, verbose=verbose)
+    results['customers'] = bulk_insert(Customer, synth.iter_customers(customers, batch_size, seed),
+                                       batch_size=batch_size, verbose=verbose)
+    rebuild_category_stats(verbose=verbose)
+    return results
+
+
+def ensure_dataset(products, batch_size=5000, seed=None, verbose=True, assume_yes=False):
+    """
+    保证库中正好有 products 个合成产品（以及相应的分类和客户），不足时重新生成
+
+    重新生成会清空数据表；不是基准测试专用数据库且 assume_yes=False 时先询问确认。
+    """
+    from django.conf import settings
+    from sample_data.models import Product
+
+    if Product.objects.count() == products:
+        return False
+    if not assume_yes and not is_bench_database():
+        name = settings.DATABASES['default']['NAME']
+        answer = input(f"需要重新生成数据，会清空数据库 {name} 中的分类、产品和客户数据，确定继续吗？[y/N] ")
+        if answer.strip().lower() not in ('y', 'yes'):
+            raise SystemExit("已取消")
+    seed_dataset(products, batch_size, seed, verbose)
+    return True
+
+
+@contextmanager
+def admin_client():
+    """
+    返回已登录的测试客户端
+
+    登录用户是临时创建的超级用户，密码不可用（只能通过 force_login 登录），退出时删除。
+    """
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    User = get_user_model()
+    user = User.objects.create_superuser(f'bench-{uuid.uuid4().hex[:12]}', None, None)
+    client = Client(HTTP_HOST='localhost')
+    client.force_login(user)
+    try:
+        yield client
+    finally:
+        client.logout()
+        user.delete()
+
+
+def make_wsgi_server(threads, host='127.0.0.1', port=0, quiet=True):
+    """
+    返回一个用固定线程池处理请求的 WSGI 服务器（与 gunicorn 的 gthread worker 相同）
+
+    runserver 每个请求新建一个线程，线程本地的数据库连接无法复用，不适合做性能测试。
+    调用 serve_forever() 开始服务，结束后调用 shutdown() 和 server_close()。
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.core.servers.basehttp import WSGIRequestHandler, WSGIServer
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            if not quiet:
+                super().log_message(*args)
+
+    class PooledWSGIServer(WSGIServer):
+        # 监听队列默认只有 10，并发连接多时会被拒绝（gunicorn 默认 2048）
+        request_queue_size = 1024
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.executor = ThreadPoolExecutor(threads)
+
+        def process_request(self, request, client_address):
+            self.executor.submit(self.process_request_thread, request, client_address)
+
+        def process_request_thread(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+        def server_close(self):
+            self.executor.shutdown()
+            super().server_close()
+
+    server = PooledWSGIServer((host, port), QuietHandler)
+    server.set_app(WSGIHandler())
+    return server
@@ -2,8 +2,11 @@
 Django settings for config project.
 """
 
+import os
 from pathlib import Path
 
+from sample_data.database import database_settings
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -24,6 +27,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # 放在最外层，统计整个请求的查询次数和耗时
+    'sample_data.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,12 +59,53 @@ TEMPLATES = [
 WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
+# SQLite 连接调优（sample_data/sqlite.py）: tuned（WAL 等，默认）、default（SQLite 默认值）或 off
+SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'tuned')
+
+# 数据库由环境变量配置（sample_data/database.py）：DB_ENGINE、DB_NAME 等；
+# DB_PROFILE=production 开启持久连接和健康检查，PostgreSQL 上 DB_POOL=1 使用连接池
 DATABASES = {
+    'default': database_settings(BASE_DIR, SQLITE_PROFILE),
+}
+
+# 缓存（API 响应缓存见 sample_data/cache.py）
+# 默认使用本地内存缓存；可通过环境变量换成共享后端，例如
+# DJANGO_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# DJANGO_CACHE_LOCATION=redis://127.0.0.1:6379
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', 'sample-data'),
+        'TIMEOUT': int(os.environ.get('DJANGO_CACHE_TIMEOUT', 300)),
     }
 }
+if CACHES['default']['BACKEND'].endswith('LocMemCache'):
+    # 本地内存缓存默认最多 300 条，游标分页的每一页各占一条
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': 10000}
+
+API_CACHE_ALIAS = 'default'
+
+# 查询统计（sample_data/middleware.py）
+# QUERY_BUDGET: 每个请求允许的查询次数，None 表示不限制；QUERY_BUDGET_RAISE 为真时超出即抛出异常
+QUERY_BUDGET = int(os.environ['QUERY_BUDGET']) if os.environ.get('QUERY_BUDGET') else None
+QUERY_BUDGET_RAISE = os.environ.get('QUERY_BUDGET_RAISE') == '1'
+QUERY_TIMING_HEADER = DEBUG
+
+# 每个请求一行 JSON 日志；默认只输出超出查询预算的请求，QUERY_LOG_LEVEL=INFO 时输出全部请求
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'sample_data.queries': {
+            'handlers': ['console'],
+            'level': os.environ.get('QUERY_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
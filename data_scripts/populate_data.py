@@ -2,6 +2,7 @@
 
 import os
 import sys
+import argparse
 import django
 import random
 import json
@@ -26,11 +27,19 @@ except Exception as e:
 
 from django.contrib.auth.models import User
 from sample_data.models import Category, Product, Customer
+from sample_data.bulk import DEFAULT_BATCH_SIZE, bulk_insert
+from sample_data.reset import RESET_MODES, reset_tables
+from sample_data.stats import rebuild_category_stats
+from sample_data import exporter, importer
+
+DEFAULT_EXPORT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_data_export.json')
 
 class DataManager:
     """数据管理类"""
     
-    def __init__(self):
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, reset_mode='fast'):
+        self.batch_size = batch_size
+        self.reset_mode = reset_mode
         self.generated_data = {
             'categories': [],
             'products': [],
@@ -42,10 +51,8 @@ class DataManager:
         print("清理数据库中...")
         
         try:
-            # 注意：删除顺序很重要，因为有外键约束
-            Product.objects.all().delete()
-            Customer.objects.all().delete()
-            Category.objects.all().delete()
+            # 按外键依赖顺序清空样本数据表（见 reset.SAMPLE_MODELS）
+            reset_tables(mode=self.reset_mode)
             
             # 删除非管理员用户
             User.objects.filter(is_staff=False).delete()
@@ -66,13 +73,13 @@ class DataManager:
             {"name": "图书文具", "description": "书籍、文具、办公用品"},
         ]
         
-        for data in categories_data:
-            try:
-                category = Category.objects.create(**data)
-                self.generated_data['categories'].append(category)
-                print(f"  创建分类: {category.name}")
-            except Exception as e:
-                print(f"创建分类 {data['name']} 时出错: {e}")
+        result = bulk_insert(
+            Category,
+            (Category(**data) for data in categories_data),
+            batch_size=self.batch_size,
+            keep_objects=True,
+        )
+        self.generated_data['categories'].extend(result.objects)
         
         return self.generated_data['categories']
     
@@ -109,23 +116,20 @@ class DataManager:
             print("错误：没有可用的分类，请先生成分类")
             return []
         
-        for data in products_data:
-            try:
-                category = random.choice(self.generated_data['categories'])
-                
-                product = Product.objects.create(
-                    name=data["name"],
-                    description=data["desc"],
-                    price=Decimal(str(data["price"])),
-                    stock_quantity=data["stock"],
-                    category=category,
-                    status="available"
-                )
-                
-                self.generated_data['products'].append(product)
-                print(f"  创建产品: {product.name} - ¥{product.price}")
-            except Exception as e:
-                print(f"创建产品 {data['name']} 时出错: {e}")
+        products = (
+            Product(
+                name=data["name"],
+                description=data["desc"],
+                price=Decimal(str(data["price"])),
+                stock_quantity=data["stock"],
+                category=random.choice(self.generated_data['categories']),
+                status="available"
+            )
+            for data in products_data
+        )
+        
+        result = bulk_insert(Product, products, batch_size=self.batch_size, keep_objects=True)
+        self.generated_data['products'].extend(result.objects)
         
         return self.generated_data['products']
     
@@ -141,16 +145,26 @@ class DataManager:
             {"name": "钱七", "email": "qianqi@email.com", "phone": "13800138005", "address": "杭州市西湖区文三路202号"},
         ]
         
-        for data in customers_data:
-            try:
-                customer = Customer.objects.create(**data)
-                self.generated_data['customers'].append(customer)
-                print(f"  创建客户: {customer.name} - {customer.email}")
-            except Exception as e:
-                print(f"创建客户 {data['name']} 时出错: {e}")
+        result = bulk_insert(
+            Customer,
+            (Customer(**data) for data in customers_data),
+            batch_size=self.batch_size,
+            keep_objects=True,
+        )
+        self.generated_data['customers'].extend(result.objects)
         
         return self.generated_data['customers']
     
+    def export_data(self, path=DEFAULT_EXPORT_PATH, fmt=None, chunk_size=exporter.DEFAULT_CHUNK_SIZE):
+        """流式导出分类、产品和客户到 JSON / JSON Lines 文件（.gz 结尾时压缩）"""
+        print(f"导出数据到 {path}...")
+        return exporter.export_data(path, fmt=fmt, chunk_size=chunk_size)
+    
+    def import_data(self, path=DEFAULT_EXPORT_PATH, fmt=None, resume=True, sync=False):
+        """流式导入导出文件，中断后可从检查点继续；sync=True 时按自然键 upsert"""
+        print(f"从 {path} 导入数据...")
+        return importer.import_data(path, fmt=fmt, batch_size=self.batch_size, resume=resume, sync=sync)
+    
     def generate_sample_data(self):
         """生成完整的样本数据"""
         print("开始生成样本数据...")
@@ -163,6 +177,7 @@ class DataManager:
         categories = self.generate_categories()
         products = self.generate_products()
         customers = self.generate_customers()
+        rebuild_category_stats()
         
         # 统计信息
         total_records = len(categories) + len(products) + len(customers)
@@ -179,14 +194,60 @@ class DataManager:
         print("   2. 访问: http://localhost:8000/admin/")
         print("   3. 使用管理员账户登录查看数据")
 
-def main():
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="Django 样本数据管理系统")
+    parser.add_argument(
+        '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+        help=f"每批写入的记录数，每批一个事务（默认 {DEFAULT_BATCH_SIZE}）"
+    )
+    parser.add_argument(
+        '--reset-mode', choices=RESET_MODES, default='fast',
+        help="清理方式：fast 使用 TRUNCATE/DELETE FROM 清表（默认），orm 使用 ORM 逐条级联删除"
+    )
+    parser.add_argument(
+        '--export', nargs='?', const=DEFAULT_EXPORT_PATH, metavar='PATH',
+        help="导出数据而不是重新生成（默认导出到 data_scripts/sample_data_export.json，"
+             "*.jsonl 为 JSON Lines，*.gz 自动压缩）"
+    )
+    parser.add_argument(
+        '--import', dest='import_path', nargs='?', const=DEFAULT_EXPORT_PATH, metavar='PATH',
+        help="从导出文件导入数据（默认 data_scripts/sample_data_export.json），中断后重新运行会自动续传"
+    )
+    parser.add_argument(
+        '--restart', action='store_true',
+        help="忽略检查点，从头开始导入"
+    )
+    parser.add_argument(
+        '--sync', action='store_true',
+        help="导入时按自然键（分类/产品名称、客户邮箱）新增或更新，而不是直接插入"
+    )
+    parser.add_argument(
+        '--format', choices=exporter.EXPORT_FORMATS,
+        help="导出/导入格式（默认根据文件名判断）"
+    )
+    parser.add_argument(
+        '--chunk-size', type=int, default=exporter.DEFAULT_CHUNK_SIZE,
+        help=f"导出时每次从数据库读取的行数（默认 {exporter.DEFAULT_CHUNK_SIZE}）"
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """主函数"""
+    args = parse_args(argv)
+    
     print("Django 样本数据管理系统")
     print("=" * 40)
     
     try:
-        manager = DataManager()
-        manager.generate_sample_data()
+        manager = DataManager(batch_size=args.batch_size, reset_mode=args.reset_mode)
+        if args.export:
+            manager.export_data(args.export, fmt=args.format, chunk_size=args.chunk_size)
+        elif args.import_path:
+            manager.import_data(args.import_path, fmt=args.format, resume=not args.restart,
+                                sync=args.sync)
+        else:
+            manager.generate_sample_data()
     except Exception as e:
         print(f"发生错误: {e}")
         print("请确保已执行数据库迁移: python manage.py migrate")
@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 import os
 import sys
+import argparse
 import django
 import random
 from decimal import Decimal
@@ -21,6 +22,12 @@ except Exception as e:
 
 from django.core.management import execute_from_command_line
 from sample_data.models import Category, Product, Customer
+from sample_data.bulk import DEFAULT_BATCH_SIZE, bulk_insert
+from sample_data import synth
+from sample_data.parallel import WRITER_MODES, parallel_generate
+from sample_data.reset import RESET_MODES, reset_tables
+from sample_data.stats import rebuild_category_stats
+from sample_data.sync import upsert
 
 def setup_database():
     """设置数据库（迁移和创建表）"""
@@ -67,20 +74,18 @@ def create_superuser():
         print(f"创建管理员用户失败: {e}")
         return False
 
-def clean_database():
+def clean_database(mode='fast'):
     """清理数据库中的所有样本数据"""
     print("清理数据库中...")
     
     try:
-        # 注意：删除顺序很重要，因为有外键约束
-        Product.objects.all().delete()
-        Customer.objects.all().delete()
-        Category.objects.all().delete()
+        # 按外键依赖顺序清空样本数据表（见 reset.SAMPLE_MODELS）
+        reset_tables(mode=mode)
         print("数据库清理完成")
     except Exception as e:
         print(f"清理数据库时出错: {e}")
 
-def generate_categories():
+def generate_categories(batch_size=DEFAULT_BATCH_SIZE, sync=False):
     """生成商品分类数据"""
     print("生成商品分类...")
     
@@ -94,18 +99,20 @@ def generate_categories():
         {"name": "美妆个护", "description": "化妆品、护肤品、个人护理"},
     ]
     
-    categories = []
-    for data in categories_data:
-        try:
-            category = Category.objects.create(**data)
-            categories.append(category)
-            print(f"  ✓ 创建分类: {category.name}")
-        except Exception as e:
-            print(f"创建分类 {data['name']} 时出错: {e}")
+    if sync:
+        upsert(Category, (Category(**data) for data in categories_data), batch_size=batch_size)
+        names = [data["name"] for data in categories_data]
+        return list(Category.objects.filter(name__in=names).order_by('id'))
     
-    return categories
+    result = bulk_insert(
+        Category,
+        (Category(**data) for data in categories_data),
+        batch_size=batch_size,
+        keep_objects=True,
+    )
+    return result.objects
 
-def generate_products(categories):
+def generate_products(categories, batch_size=DEFAULT_BATCH_SIZE, sync=False):
     """生成产品数据"""
     print("生成产品数据...")
     
@@ -144,28 +151,27 @@ def generate_products(categories):
         {"name": "洗发水", "price": 89.00, "stock": 180, "desc": "无硅油配方，呵护头皮健康"},
     ]
     
-    products = []
-    for data in products_data:
-        try:
-            category = random.choice(categories)
-            
-            product = Product.objects.create(
-                name=data["name"],
-                description=data["desc"],
-                price=Decimal(str(data["price"])),
-                stock_quantity=data["stock"],
-                category=category,
-                status="available"
-            )
-            
-            products.append(product)
-            print(f"  ✓ 创建产品: {product.name} - ¥{product.price}")
-        except Exception as e:
-            print(f"创建产品 {data['name']} 时出错: {e}")
+    products = (
+        Product(
+            name=data["name"],
+            description=data["desc"],
+            price=Decimal(str(data["price"])),
+            stock_quantity=data["stock"],
+            category=random.choice(categories),
+            status="available"
+        )
+        for data in products_data
+    )
+    
+    if sync:
+        products = list(products)
+        upsert(Product, products, batch_size=batch_size)
+        return products
     
-    return products
+    result = bulk_insert(Product, products, batch_size=batch_size, keep_objects=True)
+    return result.objects
 
-def generate_customers():
+def generate_customers(batch_size=DEFAULT_BATCH_SIZE, sync=False):
     """生成客户数据"""
     print("生成客户数据...")
     
@@ -180,19 +186,123 @@ def generate_customers():
         {"name": "吴十", "email": "wushi@email.com", "phone": "13800138008", "address": "南京市鼓楼区中山路505号"},
     ]
     
-    customers = []
-    for data in customers_data:
-        try:
-            customer = Customer.objects.create(**data)
-            customers.append(customer)
-            print(f"  ✓ 创建客户: {customer.name} - {customer.email}")
-        except Exception as e:
-            print(f"创建客户 {data['name']} 时出错: {e}")
+    if sync:
+        customers = [Customer(**data) for data in customers_data]
+        upsert(Customer, customers, batch_size=batch_size)
+        return customers
+    
+    result = bulk_insert(
+        Customer,
+        (Customer(**data) for data in customers_data),
+        batch_size=batch_size,
+        keep_objects=True,
+    )
+    return result.objects
+
+def sync_synthetic_data(rows, categories, customers, batch_size=DEFAULT_BATCH_SIZE,
+                        seed=synth.DEFAULT_SEED):
+    """按自然键同步合成数据：只写入新增或有变化的记录"""
+    print(f"同步 {categories} 个分类、{rows} 个产品、{customers} 个客户 (seed={seed})...")
+    
+    category_result = upsert(Category, synth.iter_categories(categories, batch_size, seed), batch_size)
+    # 按合成顺序取分类主键，保证每次同步时产品分配到相同的分类
+    lookup = dict(Category.objects.values_list('name', 'id'))
+    category_ids = [lookup[c.name] for c in synth.iter_categories(categories, batch_size, seed)]
+    
+    product_result = upsert(Product, synth.iter_products(rows, category_ids, batch_size, seed), batch_size)
+    customer_result = upsert(Customer, synth.iter_customers(customers, batch_size, seed), batch_size)
+    
+    return category_result.total, product_result.total, customer_result.total
+
+def generate_synthetic_data(rows, categories, customers, batch_size=DEFAULT_BATCH_SIZE,
+                            seed=synth.DEFAULT_SEED, workers=1, shards=None, writers='auto'):
+    """按目标行数批量合成分类、产品和客户，边生成边写入；workers > 1 时多进程分片生成"""
+    print(f"合成 {categories} 个分类、{rows} 个产品、{customers} 个客户 (seed={seed})...")
+    
+    category_result = bulk_insert(
+        Category, synth.iter_categories(categories, batch_size, seed), batch_size=batch_size
+    )
+    category_ids = list(Category.objects.order_by('id').values_list('id', flat=True))
+    if not category_ids:
+        print("错误：没有可用的分类，无法生成产品")
+        return category_result.inserted, 0, 0
+    
+    if workers > 1:
+        total_products = parallel_generate(
+            'product', rows, workers, batch_size, seed,
+            shards=shards, category_ids=category_ids, writer_mode=writers,
+        )
+        total_customers = parallel_generate(
+            'customer', customers, workers, batch_size, seed,
+            shards=shards, writer_mode=writers,
+        )
+        return category_result.inserted, total_products, total_customers
+    
+    product_result = bulk_insert(
+        Product, synth.iter_products(rows, category_ids, batch_size, seed), batch_size=batch_size
+    )
+    customer_result = bulk_insert(
+        Customer, synth.iter_customers(customers, batch_size, seed), batch_size=batch_size
+    )
     
-    return customers
+    return category_result.inserted, product_result.inserted, customer_result.inserted
 
-def main():
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="Django 样本数据生成系统")
+    parser.add_argument(
+        '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+        help=f"每批写入的记录数，每批一个事务（默认 {DEFAULT_BATCH_SIZE}）"
+    )
+    parser.add_argument(
+        '--rows', type=int,
+        help="合成的产品数量；不指定时使用内置的少量样本数据"
+    )
+    parser.add_argument(
+        '--categories', type=int,
+        help="合成的分类数量（默认 max(7, rows / 1000)）"
+    )
+    parser.add_argument(
+        '--customers', type=int,
+        help="合成的客户数量（默认 rows / 2）"
+    )
+    parser.add_argument(
+        '--seed', type=int, default=synth.DEFAULT_SEED,
+        help="随机数种子，相同种子生成相同的数据"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help="合成数据使用的进程数（默认 1，即单进程）"
+    )
+    parser.add_argument(
+        '--shards', type=int,
+        help="把目标行数切分成的分片数（默认等于进程数）"
+    )
+    parser.add_argument(
+        '--writers', choices=WRITER_MODES, default='auto',
+        help="写入模式：single 由主进程统一写入，concurrent 由各进程并发写入，"
+             "auto 在 SQLite 上用 single、其他数据库用 concurrent"
+    )
+    parser.add_argument(
+        '--sync', action='store_true',
+        help="同步模式：不清空数据，按自然键（分类/产品名称、客户邮箱）新增或更新有变化的记录"
+    )
+    parser.add_argument(
+        '--reset-mode', choices=RESET_MODES, default='fast',
+        help="清理方式：fast 使用 TRUNCATE/DELETE FROM 清表（默认），orm 使用 ORM 逐条级联删除"
+    )
+    args = parser.parse_args(argv)
+    if args.rows is not None:
+        if args.categories is None:
+            args.categories = max(len(synth.BASE_CATEGORIES), args.rows // 1000)
+        if args.customers is None:
+            args.customers = args.rows // 2
+    return args
+
+def main(argv=None):
     """主函数"""
+    args = parse_args(argv)
+    
     print("=" * 50)
     print("Django 样本数据生成系统 (修复版)")
     print("=" * 50)
@@ -205,21 +315,38 @@ def main():
     # 2. 创建管理员用户
     create_superuser()
     
-    # 3. 清理现有数据
-    clean_database()
+    # 3. 清理现有数据（同步模式下保留已有数据）
+    random.seed(args.seed)
+    if not args.sync:
+        clean_database(args.reset_mode)
     
     # 4. 生成样本数据
     print("\n开始生成样本数据...")
     print("-" * 40)
     
-    categories = generate_categories()
-    products = generate_products(categories)
-    customers = generate_customers()
+    if args.rows is not None and args.sync:
+        if args.workers > 1:
+            print("同步模式暂不支持多进程，使用单进程同步")
+        total_categories, total_products, total_customers = sync_synthetic_data(
+            args.rows, args.categories, args.customers, args.batch_size, args.seed
+        )
+    elif args.rows is not None:
+        total_categories, total_products, total_customers = generate_synthetic_data(
+            args.rows, args.categories, args.customers, args.batch_size, args.seed,
+            workers=args.workers, shards=args.shards, writers=args.writers,
+        )
+    else:
+        categories = generate_categories(args.batch_size, args.sync)
+        products = generate_products(categories, args.batch_size, args.sync)
+        customers = generate_customers(args.batch_size, args.sync)
+        total_categories = len(categories)
+        total_products = len(products)
+        total_customers = len(customers)
+    
+    # 批量写入不经过信号，整体重建分类统计
+    rebuild_category_stats()
     
     # 统计信息
-    total_categories = len(categories)
-    total_products = len(products)
-    total_customers = len(customers)
     total_records = total_categories + total_products + total_customers
     
     print("\n" + "=" * 50)
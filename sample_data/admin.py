@@ -1,20 +1,199 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponseRedirect
+from django.urls import path, reverse
+from django.utils import timezone
 from .models import Category, Product, Customer
+from .paginators import EstimatedCountPaginator
+from .stats import rebuild_category_stats
+from . import csv_export, pricing, search
+
+class ExportChangeList(ChangeList):
+    """与列表页相同的过滤、搜索和排序，但不统计行数、不查询当前页（导出不需要分页）"""
+
+    def get_results(self, request):
+        pass
+
+
+class CsvExportMixin:
+    """
+    把当前过滤 / 搜索结果流式导出为 CSV（见 csv_export.py）
+
+    列表页右上角的“导出 CSV”按钮导出当前过滤、搜索和排序后的全部结果；
+    “导出所选为 CSV”动作导出勾选的记录（或“选择全部”时的当前过滤结果）。
+    """
+    change_list_template = 'admin/sample_data/change_list_export.html'
+    csv_fields = []
+
+    def get_urls(self):
+        name = f'{self.opts.app_label}_{self.opts.model_name}_export_csv'
+        return [
+            path('export-csv/', self.admin_site.admin_view(self.export_csv_view), name=name),
+        ] + super().get_urls()
+
+    def get_changelist(self, request, **kwargs):
+        if getattr(request, 'csv_export', False):
+            return ExportChangeList
+        return super().get_changelist(request, **kwargs)
+
+    def _csv_response(self, queryset):
+        filename = f"{self.opts.model_name}-{timezone.localtime():%Y%m%d-%H%M%S}.csv"
+        return csv_export.csv_response(queryset, self.csv_fields, filename)
+
+    def export_csv_view(self, request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        # get_changelist() 据此返回 ExportChangeList：只解析过滤、搜索和排序，不执行 COUNT 和分页查询
+        request.csv_export = True
+        try:
+            # 与列表页相同的过滤、搜索和排序
+            changelist = self.get_changelist_instance(request)
+        except IncorrectLookupParameters:
+            # 交给列表页处理无效的过滤参数
+            url = reverse(f'admin:{self.opts.app_label}_{self.opts.model_name}_changelist')
+            return HttpResponseRedirect(f"{url}?{request.GET.urlencode()}")
+        return self._csv_response(changelist.queryset)
+
+    @admin.action(description='把所选%(verbose_name_plural)s导出为 CSV', permissions=['view'])
+    def export_csv(self, request, queryset):
+        return self._csv_response(queryset)
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ['name', 'created_at']
+    list_display = [
+        'name', 'product_count', 'out_of_stock_count', 'stock_value', 'price_range', 'avg_price',
+        'created_at',
+    ]
     search_fields = ['name']
     list_filter = ['created_at']
+    # 统计数据来自预先计算的分类统计表，不对产品表做 GROUP BY
+    list_select_related = ['stats']
+    actions = ['rebuild_stats']
+
+    def _stats(self, obj):
+        try:
+            return obj.stats
+        except Category.stats.RelatedObjectDoesNotExist:
+            return None
+
+    @admin.display(description='产品数', ordering='stats__product_count')
+    def product_count(self, obj):
+        stats = self._stats(obj)
+        return stats.product_count if stats else 0
+
+    @admin.display(description='缺货产品数', ordering='stats__out_of_stock_count')
+    def out_of_stock_count(self, obj):
+        stats = self._stats(obj)
+        return stats.out_of_stock_count if stats else 0
+
+    @admin.display(description='库存总值', ordering='stats__stock_value')
+    def stock_value(self, obj):
+        stats = self._stats(obj)
+        return f"¥{stats.stock_value:,.2f}" if stats else '-'
+
+    @admin.display(description='价格区间')
+    def price_range(self, obj):
+        stats = self._stats(obj)
+        if not stats or stats.min_price is None:
+            return '-'
+        return f"¥{stats.min_price} - ¥{stats.max_price}"
+
+    @admin.display(description='平均价格')
+    def avg_price(self, obj):
+        stats = self._stats(obj)
+        return f"¥{stats.avg_price}" if stats and stats.avg_price is not None else '-'
+
+    @admin.action(description='重建所选分类的统计', permissions=['change'])
+    def rebuild_stats(self, request, queryset):
+        count = rebuild_category_stats(queryset.values_list('pk', flat=True), verbose=False)
+        self.message_user(request, f"已重建 {count} 个分类的统计")
+
+class ProductActionForm(ActionForm):
+    """批量调价 / 修改状态动作的参数"""
+    percent = forms.DecimalField(label='调价百分比', required=False, max_digits=6, decimal_places=2)
+    amount = forms.DecimalField(label='调整金额', required=False, max_digits=10, decimal_places=2)
+    new_status = forms.ChoiceField(
+        label='新状态', required=False, choices=[('', '---------')] + Product.STATUS_CHOICES,
+    )
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(CsvExportMixin, admin.ModelAdmin):
     list_display = ['name', 'price', 'stock_quantity', 'category', 'status', 'created_at']
     list_filter = ['category', 'status', 'created_at']
     search_fields = ['name', 'description']
+    ordering = ['-created_at']
+    # 分类用一次 IN 查询批量取出，避免每行一次查询。
+    # 不用 JOIN（list_select_related）：SQLite 会以小的分类表驱动连接，
+    # 放弃 created_at 索引而对整表排序。
+    list_select_related = []
+    # 大表上不再额外执行一次全表 COUNT(*)，未过滤时使用估算行数
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    # 批量动作直接执行集合式 UPDATE（见 pricing.py），勾选“选择全部”时作用于当前过滤结果
+    action_form = ProductActionForm
+    actions = ['reprice_products', 'set_products_status', 'export_csv']
+    csv_fields = ['id', 'name', 'category', 'price', 'stock_quantity', 'status', 'created_at', 'updated_at']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('category')
+
+    def _action_params(self, request):
+        form = self.action_form(request.POST)
+        form.fields['action'].choices = self.get_action_choices(request)
+        if not form.is_valid():
+            self.message_user(request, f"参数无效: {form.errors.as_text()}", messages.ERROR)
+            return None
+        return form.cleaned_data
+
+    @admin.action(description='按百分比 / 金额调整所选产品的价格', permissions=['change'])
+    def reprice_products(self, request, queryset):
+        params = self._action_params(request)
+        if params is None:
+            return
+        if params['percent'] is None and params['amount'] is None:
+            self.message_user(request, "请填写调价百分比或调整金额", messages.ERROR)
+            return
+        try:
+            result = pricing.reprice(queryset, percent=params['percent'], amount=params['amount'],
+                                     verbose=False)
+        except ValueError as e:
+            self.message_user(request, str(e), messages.ERROR)
+            return
+        self.message_user(request, f"已调整 {result.updated} 个产品的价格，耗时 {result.elapsed:.2f} 秒")
+
+    @admin.action(description='把所选产品改为选定的状态', permissions=['change'])
+    def set_products_status(self, request, queryset):
+        params = self._action_params(request)
+        if params is None:
+            return
+        if not params['new_status']:
+            self.message_user(request, "请选择新状态", messages.ERROR)
+            return
+        result = pricing.set_status(queryset, params['new_status'], verbose=False)
+        self.message_user(request, f"已修改 {result.updated} 个产品的状态，耗时 {result.elapsed:.2f} 秒")
+
+    def get_search_results(self, request, queryset, search_term):
+        # 使用全文索引（PostgreSQL 三元组索引 / SQLite FTS5）代替整表 LIKE 扫描
+        if not search_term:
+            return queryset, False
+        return search.search(queryset, search_term), False
 
 @admin.register(Customer)
-class CustomerAdmin(admin.ModelAdmin):
+class CustomerAdmin(CsvExportMixin, admin.ModelAdmin):
     list_display = ['name', 'email', 'phone', 'date_joined']
     search_fields = ['name', 'email']
-    list_filter = ['date_joined']
\ No newline at end of file
+    list_filter = ['date_joined']
+    ordering = ['-date_joined']
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    actions = ['export_csv']
+    csv_fields = ['id', 'name', 'email', 'phone', 'address', 'date_joined']
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search.search(queryset, search_term), False
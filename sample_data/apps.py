@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class SampleDataConfig(AppConfig):
+    name = 'sample_data'
+
+    def ready(self):
+        from .signals import connect_signals
+        connect_signals()
@@ -0,0 +1,192 @@
+"""
+只读 JSON API 的异步版本（/api/async/...）
+
+与 views.py 的接口参数和响应格式相同，用异步 ORM（``aiterator``、``aget``、``acount``）
+查询，缓存用 ``cache.aget_or_compute``。通过 ASGI（config/asgi.py，例如
+``uvicorn config.asgi:application``）部署时，等待数据库和慢速客户端期间事件循环可以继续
+处理其他连接，一个 worker 能同时保持大量连接。
+
+Django 的异步 ORM 仍把查询交给同一个线程依次执行。彼此独立的查询用 fan_out()
+分别放到线程池中，各自使用独立的数据库连接并发执行，例如分类概览接口。
+
+客户接口与同步版本一样只对职员开放（views.staff_required）。
+
+条件请求（conditional.py）的校验值需要同步查询，异步接口不支持 ETag / 304。
+"""
+
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.views.decorators.http import require_GET
+
+from . import cache
+from .models import Category, CategoryStats, Product, Customer
+from .views import (
+    CATEGORY_FIELDS, CUSTOMER_FIELDS, PRODUCT_FIELDS, STATS_FIELDS, BadRequest, api_response,
+    category_stats_queryset, error_response, keyset_query, keyset_result, not_found, page_data,
+    product_list_query, staff_required, stats_rows,
+)
+
+OVERVIEW_PRODUCTS = 5
+
+
+async def cached_response(request, name, models, compute, params=None):
+    """
+    views.cached_response() 的异步版本，compute 为协程函数
+
+    缓存名加上 async: 前缀：列表的 next 链接指向 /api/async/，不能与同步接口共用。
+    """
+    if params is None:
+        params = '&'.join(sorted(request.GET.urlencode().split('&')))
+    data, hit = await cache.aget_or_compute(f'async:{name}', models, params, compute)
+    response = api_response(data) if data is not None else not_found()
+    response['X-Cache'] = 'HIT' if hit else 'MISS'
+    return response
+
+
+def handle_bad_request(view):
+    """把 BadRequest 转换为 400 响应"""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            return await view(request, *args, **kwargs)
+        except BadRequest as e:
+            return error_response(str(e))
+    return wrapper
+
+
+async def keyset_page(request, queryset, fields, order_field='id'):
+    page, size = keyset_query(request, queryset, fields, order_field)
+    rows = [row async for row in page.aiterator()]
+    return keyset_result(rows, size, order_field)
+
+
+async def attach_category_names(rows):
+    ids = {row['category_id'] for row in rows}
+    # 不能用 values_list().aiterator()：Django 5.2 中它会抛出 SynchronousOnlyOperation，这里用 values()
+    names = {
+        row['id']: row['name']
+        async for row in Category.objects.filter(id__in=ids).values('id', 'name').aiterator()
+    }
+    for row in rows:
+        row['category_name'] = names.get(row['category_id'])
+    return rows
+
+
+async def get_row(model, fields, pk):
+    try:
+        return await model.objects.values(*fields).aget(pk=pk)
+    except model.DoesNotExist:
+        return None
+
+
+def _in_thread(fn):
+    """在线程池的线程中执行 fn，结束后按 CONN_MAX_AGE 关闭该线程的数据库连接"""
+    def run():
+        try:
+            return fn()
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)()
+
+
+async def fan_out(*fns):
+    """并发执行若干彼此独立的同步查询函数，按顺序返回结果"""
+    return await asyncio.gather(*(_in_thread(fn) for fn in fns))
+
+
+@require_GET
+@handle_bad_request
+async def product_list(request):
+    queryset, order = product_list_query(request)
+
+    async def compute():
+        rows, next_cursor = await keyset_page(request, queryset, PRODUCT_FIELDS, order)
+        return page_data(request, await attach_category_names(rows), next_cursor)
+    return await cached_response(request, 'product_list', [Product, Category], compute)
+
+
+@require_GET
+async def product_detail(request, pk):
+    async def compute():
+        row = await get_row(Product, PRODUCT_FIELDS, pk)
+        return (await attach_category_names([row]))[0] if row is not None else None
+    return await cached_response(request, 'product_detail', [Product, Category], compute, str(pk))
+
+
+@require_GET
+@handle_bad_request
+async def category_list(request):
+    async def compute():
+        rows, next_cursor = await keyset_page(request, Category.objects.all(), CATEGORY_FIELDS)
+        return page_data(request, rows, next_cursor)
+    return await cached_response(request, 'category_list', [Category], compute)
+
+
+@require_GET
+async def category_detail(request, pk):
+    async def compute():
+        return await get_row(Category, CATEGORY_FIELDS, pk)
+    return await cached_response(request, 'category_detail', [Category], compute, str(pk))
+
+
+@require_GET
+async def category_overview(request, pk):
+    """分类概览：分类信息、统计、最近更新的产品和缺货数，四个查询并发执行"""
+    products = Product.objects.filter(category_id=pk)
+
+    async def compute():
+        category, stats, recent, out_of_stock = await fan_out(
+            lambda: Category.objects.filter(pk=pk).values(*CATEGORY_FIELDS).first(),
+            lambda: CategoryStats.objects.filter(pk=pk).values(*STATS_FIELDS).first(),
+            lambda: list(products.order_by('-updated_at', '-id').values(*PRODUCT_FIELDS)[:OVERVIEW_PRODUCTS]),
+            lambda: products.filter(status='out_of_stock').count(),
+        )
+        if category is None:
+            return None
+        category['stats'] = stats_rows([stats])[0] if stats is not None else None
+        category['recent_products'] = recent
+        category['out_of_stock'] = out_of_stock
+        return category
+    return await cached_response(request, 'category_overview', [Category, CategoryStats, Product],
+                                 compute, str(pk))
+
+
+@require_GET
+@handle_bad_request
+async def category_stats_list(request):
+    async def compute():
+        rows, next_cursor = await keyset_page(request, category_stats_queryset(), ['id', 'name', *STATS_FIELDS])
+        return page_data(request, stats_rows(rows), next_cursor)
+    return await cached_response(request, 'category_stats', [Category, CategoryStats], compute)
+
+
+@require_GET
+@staff_required
+@handle_bad_request
+async def customer_list(request):
+    async def compute():
+        rows, next_cursor = await keyset_page(request, Customer.objects.all(), CUSTOMER_FIELDS)
+        return page_data(request, rows, next_cursor)
+    return await cached_response(request, 'customer_list', [Customer], compute)
+
+
+@require_GET
+@staff_required
+async def customer_detail(request, pk):
+    async def compute():
+        return await get_row(Customer, CUSTOMER_FIELDS, pk)
+    return await cached_response(request, 'customer_detail', [Customer], compute, str(pk))
+
+
+@require_GET
+@handle_bad_request
+async def product_count(request):
+    """?status= &category= 过滤后的产品数"""
+    queryset, _ = product_list_query(request)
+
+    async def compute():
+        return {'count': await queryset.acount()}
+    return await cached_response(request, 'product_count', [Product], compute)
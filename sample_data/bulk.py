@@ -0,0 +1,87 @@
+"""
+批量写入工具
+
+用按批的 ``bulk_create`` 代替逐行 ``objects.create()``：每一批在一个事务中提交，
+出错时只回滚并报告出错的那一批，而不是逐行打印。
+"""
+
+import time
+from itertools import islice
+
+from django.db import DatabaseError, transaction
+
+from .cache import bump_version
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def iter_batches(iterable, batch_size):
+    """把任意可迭代对象切分为长度不超过 batch_size 的列表"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class BulkInsertResult:
+    """一次批量写入的统计结果"""
+
+    def __init__(self, label):
+        self.label = label
+        self.inserted = 0
+        self.batches = 0
+        self.failed_batches = []
+        self.objects = []
+        self.elapsed = 0.0
+
+    @property
+    def failed_rows(self):
+        return sum(size for _, size, _ in self.failed_batches)
+
+    @property
+    def rows_per_second(self):
+        return self.inserted / self.elapsed if self.elapsed else 0.0
+
+
+def bulk_insert(model, objs, batch_size=DEFAULT_BATCH_SIZE, keep_objects=False,
+                using='default', verbose=True):
+    """
+    按批写入模型实例
+
+    objs 可以是列表或生成器，函数只在内存中保留当前一批。
+    keep_objects=True 时返回写入成功的实例（主键已回填，适合分类这类小表）。
+    """
+    label = model._meta.verbose_name
+    result = BulkInsertResult(label)
+    start = time.perf_counter()
+
+    for number, batch in enumerate(iter_batches(objs, batch_size), start=1):
+        result.batches = number
+        try:
+            with transaction.atomic(using=using):
+                model.objects.using(using).bulk_create(batch, batch_size=batch_size)
+        except DatabaseError as e:
+            result.failed_batches.append((number, len(batch), e))
+            if verbose:
+                print(f"  ✗ {label} 第 {number} 批（{len(batch)} 条）写入失败: {e}")
+            continue
+
+        result.inserted += len(batch)
+        if keep_objects:
+            result.objects.extend(batch)
+
+    result.elapsed = time.perf_counter() - start
+    # bulk_create 不发送 post_save 信号，需要手动使缓存失效
+    if result.inserted:
+        bump_version(model, using=using)
+
+    if verbose:
+        print(f"  ✓ {label}: 写入 {result.inserted} 条，共 {result.batches} 批，"
+              f"耗时 {result.elapsed:.2f} 秒（{result.rows_per_second:,.0f} 条/秒）")
+        if result.failed_batches:
+            print(f"  ✗ {label}: {len(result.failed_batches)} 批失败，"
+                  f"共 {result.failed_rows} 条未写入")
+
+    return result
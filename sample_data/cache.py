@@ -0,0 +1,170 @@
+"""
+API 响应缓存
+
+目录数据读多写少，列表和详情接口的结果按“版本化的键”缓存：
+
+- 每个模型在缓存中有一个版本号（``sample_data:version:<模型>``）
+- 缓存键包含该接口依赖的所有模型的当前版本号
+- 模型保存或删除时（signals.py）以及批量写入、清表之后把版本号加一，
+  旧的键从此不再被访问，等待过期或被淘汰，不需要逐个查找删除
+- 在事务中调用 bump_version() 时，版本号在事务提交之后才加一。如果在提交前加一，
+  并发的请求可能读到新版本号和尚未提交的旧数据，把旧数据缓存在新的键下直到过期
+
+版本号的初始值取当前毫秒时间戳而不是 1：版本键被淘汰后重新生成的值一定比
+以前用过的都大，不会命中淘汰之前留下的旧数据。
+
+缓存后端使用 settings.CACHES 中的 API_CACHE_ALIAS（默认 'default'）。
+注意本地内存缓存只在当前进程内有效：如果数据由另一个进程写入（例如运行
+generate_data.py），需要换成 Redis、数据库等共享后端，否则只能等待缓存过期。
+"""
+
+import hashlib
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+KEY_PREFIX = 'sample_data'
+
+_MISSING = object()
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def _version_key(model):
+    return f"{KEY_PREFIX}:version:{model._meta.label_lower}"
+
+
+def _new_version():
+    return int(time.time() * 1000)
+
+
+def get_versions(models):
+    """返回 models 的当前版本号列表，缺失的版本号会被初始化"""
+    cache = get_cache()
+    keys = [_version_key(model) for model in models]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            cache.add(key, _new_version(), timeout=None)
+            version = cache.get(key)
+        versions.append(version)
+    return versions
+
+
+def bump_version(*models, using=None):
+    """使 models 相关的所有缓存失效；在事务中调用时推迟到事务提交之后（回滚则不执行）"""
+    transaction.on_commit(lambda: _bump(models), using=using)
+
+
+def _bump(models):
+    cache = get_cache()
+    for model in models:
+        key = _version_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # 版本键不存在（从未读取过或已被淘汰）
+            cache.set(key, _new_version(), timeout=None)
+
+
+def make_key(name, models, params=''):
+    """由接口名、依赖模型的版本号和请求参数组成缓存键"""
+    versions = '.'.join(str(v) for v in get_versions(models))
+    digest = hashlib.md5(params.encode()).hexdigest()
+    return f"{KEY_PREFIX}:{name}:{versions}:{digest}"
+
+
+def _record(name, hit):
+    with _stats_lock:
+        counts = _stats.setdefault(name, [0, 0])
+        counts[0 if hit else 1] += 1
+
+
+def get_or_compute(name, models, params, compute, timeout=None):
+    """
+    取缓存的结果，未命中时调用 compute() 计算并写入缓存
+
+    返回 (结果, 是否命中)。compute() 返回 None 时不缓存。
+    """
+    cache = get_cache()
+    key = make_key(name, models, params)
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        _record(name, True)
+        return value, True
+
+    _record(name, False)
+    value = compute()
+    if value is not None:
+        if timeout is None:
+            cache.set(key, value)
+        else:
+            cache.set(key, value, timeout)
+    return value, False
+
+
+def _in_process(cache):
+    """本地内存和空缓存的操作不涉及 I/O，可以在事件循环中直接调用"""
+    return isinstance(cache, (LocMemCache, DummyCache))
+
+
+async def aget_or_compute(name, models, params, compute, timeout=None):
+    """
+    get_or_compute() 的异步版本，compute 为协程函数
+
+    Django 缓存后端的异步方法只是逐个用 sync_to_async 包装同步方法，每次调用切换一次线程；
+    这里把读版本号和读缓存合并为一次切换，进程内缓存则直接调用。
+    """
+    cache = get_cache()
+    local = _in_process(cache)
+
+    def lookup():
+        key = make_key(name, models, params)
+        return key, cache.get(key, _MISSING)
+
+    key, value = lookup() if local else await sync_to_async(lookup)()
+    if value is not _MISSING:
+        _record(name, True)
+        return value, True
+
+    _record(name, False)
+    value = await compute()
+    if value is not None:
+        args = (key, value) if timeout is None else (key, value, timeout)
+        if local:
+            cache.set(*args)
+        else:
+            await sync_to_async(cache.set)(*args)
+    return value, False
+
+
+def cache_stats():
+    """返回当前进程内各接口的命中/未命中次数"""
+    with _stats_lock:
+        snapshot = {name: list(counts) for name, counts in _stats.items()}
+    stats = {}
+    for name, (hits, misses) in sorted(snapshot.items()):
+        total = hits + misses
+        stats[name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else 0.0,
+        }
+    return stats
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,151 @@
+"""
+增量变更流
+
+下游系统不必每次重新导出整个目录，只需取“上次同步之后”的变化：
+
+- 产品: ``updated_at`` 晚于游标的记录（新增和修改）
+- 分类 / 客户: ``created_at`` / ``date_joined`` 晚于游标的新记录（这两个模型没有更新时间）
+- 删除: post_delete 信号写入的 DeletedRecord（墓碑）
+
+每个来源按 (时间, id) 排序，由对应的联合索引支撑，每次只读取游标之后的一页，
+代价与变化量成正比。多个来源按时间归并成一个稳定的顺序，游标记录每个来源
+各自读到的位置，可以随时中断、从游标继续。
+
+写入时间在事务提交之前就已确定，较早开始但较晚提交的事务可能出现在游标之后；
+因此只返回早于“当前时间 - 安全窗口”的变化（settings.CHANGEFEED_SAFETY_WINDOW，默认 5 秒）。
+
+注意：批量的 ``QuerySet.update()`` 不会自动修改 ``updated_at``，需要显式写入；
+清表（reset.py）不经过信号、不产生墓碑，清表后下游需要从头全量同步。
+"""
+
+import heapq
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Category, Product, Customer, DeletedRecord
+from .sync import SYNC_SPECS
+
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_SAFETY_WINDOW = 5
+
+DELETED_FIELDS = ['id', 'model', 'object_id', 'natural_key', 'deleted_at']
+
+# 来源名 -> (模型, 时间字段)；同一时间的变化按此顺序排列
+FEEDS = {
+    'category': (Category, 'created_at'),
+    'product': (Product, 'updated_at'),
+    'customer': (Customer, 'date_joined'),
+    'deleted': (DeletedRecord, 'deleted_at'),
+}
+_FEED_ORDER = {name: i for i, name in enumerate(FEEDS)}
+
+
+def feed_fields(name):
+    """来源输出的字段，与 API 的字段一致"""
+    from . import views
+
+    return {
+        'category': views.CATEGORY_FIELDS,
+        'product': views.PRODUCT_FIELDS,
+        'customer': views.CUSTOMER_FIELDS,
+        'deleted': DELETED_FIELDS,
+    }[name]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def safety_window():
+    return getattr(settings, 'CHANGEFEED_SAFETY_WINDOW', DEFAULT_SAFETY_WINDOW)
+
+
+def initial_positions(since=None):
+    """从 since（datetime，None 表示从头开始）开始的游标位置"""
+    if since is None:
+        return {}
+    return {name: [since.isoformat(), 0] for name in FEEDS}
+
+
+def parse_positions(positions):
+    """校验并解析游标位置：{来源: [时间, id]}"""
+    if not isinstance(positions, dict):
+        raise InvalidCursor("无效的游标")
+    parsed = {}
+    for name, position in positions.items():
+        if name not in FEEDS:
+            raise InvalidCursor("无效的游标")
+        try:
+            value, last_id = position
+            value = parse_datetime(value)
+        except (TypeError, ValueError):
+            raise InvalidCursor("无效的游标")
+        if value is None or not isinstance(last_id, int):
+            raise InvalidCursor("无效的游标")
+        parsed[name] = (value, last_id)
+    return parsed
+
+
+def _read_feed(name, position, until, limit):
+    model, time_field = FEEDS[name]
+    fields = feed_fields(name)
+    queryset = model.objects.filter(**{f'{time_field}__lte': until})
+    if position is not None:
+        value, last_id = position
+        # 写成 t >= v AND (t > v OR id > last_id)，索引范围扫描即为有序，不需要再排序
+        queryset = queryset.filter(**{f'{time_field}__gte': value}).filter(
+            Q(**{f'{time_field}__gt': value}) | Q(id__gt=last_id)
+        )
+    rows = queryset.order_by(time_field, 'id').values(*fields)[:limit]
+    return [(row[time_field], _FEED_ORDER[name], row['id'], name, row) for row in rows]
+
+
+def _change(name, row):
+    if name == 'deleted':
+        return {
+            'op': 'delete',
+            'model': row['model'],
+            'id': row['object_id'],
+            'natural_key': row['natural_key'],
+            'at': row['deleted_at'],
+        }
+    time_field = FEEDS[name][1]
+    return {'op': 'upsert', 'model': name, 'id': row['id'], 'at': row[time_field], 'data': row}
+
+
+def read_changes(positions=None, limit=DEFAULT_PAGE_SIZE, window=None):
+    """
+    读取游标位置之后的一页变化
+
+    window 为安全窗口秒数（默认取设置）。返回 (变化列表, 新的游标位置, 是否还有更多)。
+    """
+    positions = parse_positions(positions or {})
+    window = safety_window() if window is None else window
+    until = timezone.now() - timedelta(seconds=window)
+
+    # 每个来源最多读 limit + 1 条，归并后取前 limit 条
+    streams = [_read_feed(name, positions.get(name), until, limit + 1) for name in FEEDS]
+    merged = list(heapq.merge(*streams, key=lambda item: item[:3]))
+    has_more = len(merged) > limit
+    page = merged[:limit]
+
+    new_positions = {name: [value.isoformat(), last_id] for name, (value, last_id) in positions.items()}
+    changes = []
+    for value, _, pk, name, row in page:
+        new_positions[name] = [value.isoformat(), pk]
+        changes.append(_change(name, row))
+    return changes, new_positions, has_more
+
+
+def record_deletion(sender, instance, **kwargs):
+    """post_delete 信号处理：写入墓碑"""
+    key = SYNC_SPECS.get(sender, (None,))[0]
+    DeletedRecord.objects.using(kwargs.get('using') or 'default').create(
+        model=sender._meta.model_name,
+        object_id=instance.pk,
+        natural_key=str(getattr(instance, key, '') or '') if key else '',
+    )
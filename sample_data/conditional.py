@@ -0,0 +1,70 @@
+"""
+API 的条件请求（ETag）
+
+校验值只用一次聚合查询得到，不读取、不序列化任何记录：
+
+- 产品: ``MAX(updated_at)`` 和行数（行数用来发现删除），走 (updated_at, id) 索引
+- 分类: 没有更新时间字段，使用全部分类 (id, name, description) 的摘要；分类表很小，
+  而且产品接口返回的 category_name 也依赖它
+
+校验值按模型版本号缓存（见 cache.py），同一版本内的重复轮询不访问数据库。
+客户端带着匹配的 If-None-Match 请求时，
+``django.views.decorators.http.condition`` 直接返回 304，视图本身不会执行。
+
+不提供 Last-Modified：删除产品、修改分类名称都不会改变任何 updated_at，
+只带 If-Modified-Since 的客户端会得到错误的 304。ETag 包含行数和分类摘要，能发现这些变化。
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.views.decorators.http import condition
+
+from . import cache
+from .models import Category, Product
+
+
+def _digest(*parts):
+    return hashlib.md5('|'.join(str(p) for p in parts).encode()).hexdigest()
+
+
+def category_fingerprint():
+    """全部分类内容的摘要"""
+    def compute():
+        digest = hashlib.md5()
+        rows = Category.objects.order_by('id').values_list('id', 'name', 'description')
+        for row in rows.iterator(chunk_size=2000):
+            digest.update(repr(row).encode())
+        return digest.hexdigest()
+    return cache.get_or_compute('category_fingerprint', [Category], '', compute)[0]
+
+
+def product_summary():
+    """返回 (最后更新时间, 行数)"""
+    def compute():
+        summary = Product.objects.aggregate(last=Max('updated_at'), rows=Count('id'))
+        return summary['last'], summary['rows']
+    return cache.get_or_compute('product_summary', [Product], '', compute)[0]
+
+
+def _product_list_etag(request):
+    last, rows = product_summary()
+    return _digest('products', last, rows, category_fingerprint())
+
+
+def _product_detail_etag(request, pk):
+    last = Product.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+    if last is None:
+        return None
+    return _digest('product', pk, last, category_fingerprint())
+
+
+def _category_etag(request, *args, **kwargs):
+    return _digest('categories', category_fingerprint())
+
+
+product_list_condition = condition(etag_func=_product_list_etag)
+
+product_detail_condition = condition(etag_func=_product_detail_etag)
+
+category_condition = condition(etag_func=_category_etag)
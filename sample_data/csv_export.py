@@ -0,0 +1,105 @@
+"""
+流式 CSV 导出（管理后台）
+
+管理后台把当前过滤 / 搜索结果导出为 CSV（见 admin.CsvExportMixin）。响应是
+``StreamingHttpResponse``：按块读取（``values_list(...).iterator(chunk_size=...)``），
+每读完一块就发送给客户端，内存占用与导出行数无关；第一块数据很快就开始发送，
+导出上百万行也不会因为等待整个文件生成而超时。
+
+- 外键列输出关联对象的 str()。关联表（例如分类）在开始导出前一次读入内存，
+  查询中不 JOIN，排序仍然可以使用产品表上的索引
+- 带 choices 的字段输出显示名称（例如“可用”），时间转换为本地时间
+- 文件以 UTF-8 BOM 开头，Excel 可以直接正确显示中文
+- 以 ``=``、``+``、``-``、``@``、制表符或回车开头的文本前加 ``'``，防止 Excel 把单元格当作公式执行（CSV 注入）
+"""
+
+import csv
+
+from django.db import models
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+DEFAULT_CHUNK_SIZE = 2000
+
+BOM = '\ufeff'
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Echo:
+    """csv.writer 的输出对象：write() 直接返回格式化好的行，不做缓冲"""
+
+    def write(self, value):
+        return value
+
+
+def escape_formula(value):
+    """以公式字符开头的文本前加 '，表格软件会把它当作普通文本"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _time_formatter(tz):
+    def format_time(value):
+        return value.astimezone(tz).strftime(TIME_FORMAT) if value is not None else ''
+    return format_time
+
+
+def _column(model, name, tz):
+    """字段名 -> (表头, values_list 路径, 取值转换函数或 None)"""
+    field = model._meta.get_field(name)
+    header = str(field.verbose_name)
+    if field.many_to_one or field.one_to_one:
+        labels = {obj.pk: escape_formula(str(obj)) for obj in field.related_model._default_manager.all()}
+        return header, field.attname, labels.get
+    if field.choices:
+        labels = {value: escape_formula(str(label)) for value, label in field.flatchoices}
+        return header, name, lambda value: labels.get(value, value)
+    if isinstance(field, models.DateTimeField):
+        return header, name, _time_formatter(tz)
+    if isinstance(field, (models.CharField, models.TextField)):
+        return header, name, escape_formula
+    return header, name, None
+
+
+def get_columns(model, fields):
+    """
+    解析导出列，在视图中（而不是生成器里）调用
+
+    当前时区在这里取一次：响应内容在视图返回之后才生成，而且逐个值调用
+    timezone.localtime() 要反复查找当前时区，导出大表时占了一半以上的时间。
+    """
+    tz = timezone.get_current_timezone()
+    return [_column(model, name, tz) for name in fields]
+
+
+def iter_csv(queryset, columns, chunk_size=DEFAULT_CHUNK_SIZE):
+    """按 queryset 的顺序产出 CSV 文本，每块一段；columns 来自 get_columns()"""
+    converters = [(index, convert) for index, (_, _, convert) in enumerate(columns) if convert]
+    writer = csv.writer(Echo())
+
+    yield BOM + writer.writerow([header for header, _, _ in columns])
+    # values_list 不需要 prefetch_related / select_related（管理后台的 get_queryset 可能设置了）
+    rows = (queryset.prefetch_related(None).select_related(None)
+            .values_list(*[path for _, path, _ in columns]).iterator(chunk_size=chunk_size))
+    chunk = []
+    for row in rows:
+        if converters:
+            row = list(row)
+            for index, convert in converters:
+                row[index] = convert(row[index])
+        chunk.append(writer.writerow(row))
+        if len(chunk) >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def csv_response(queryset, fields, filename, chunk_size=DEFAULT_CHUNK_SIZE):
+    """把 queryset 的 fields 列导出为 CSV 附件"""
+    columns = get_columns(queryset.model, fields)
+    response = StreamingHttpResponse(iter_csv(queryset, columns, chunk_size), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
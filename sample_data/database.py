@@ -0,0 +1,81 @@
+"""
+数据库连接配置
+
+settings.DATABASES['default'] 由环境变量生成，同一份代码可以在开发和生产环境使用不同的连接方式：
+
+- DB_ENGINE: sqlite（默认）或 postgresql；DB_NAME、DB_USER、DB_PASSWORD、DB_HOST、DB_PORT
+- DB_PROFILE:
+    - development（默认）: 每个请求结束时关闭连接（CONN_MAX_AGE=0）
+    - production: 持久连接（CONN_MAX_AGE，默认 60 秒）并在复用前检查连接是否可用
+      （CONN_HEALTH_CHECKS），省去每个请求建立连接的开销（PostgreSQL 上是一次 TCP
+      握手、认证和后端进程启动，SQLite 上是打开文件和执行 PRAGMA）
+- DB_POOL=1（仅 PostgreSQL，需要 psycopg 3 和 psycopg-pool）: 使用 Django 的连接池，
+  同一进程中的所有线程共享 DB_POOL_MIN_SIZE ~ DB_POOL_MAX_SIZE 个连接，
+  取连接最多等待 DB_POOL_TIMEOUT 秒。连接池与 CONN_MAX_AGE 不能同时使用，
+  此时 CONN_MAX_AGE 固定为 0（请求结束时把连接还给池）。
+  使用 psycopg2 时没有连接池，production 配置的持久连接相当于每个线程一个连接。
+- DB_CONN_MAX_AGE: 覆盖持久连接的存活时间（秒），None 表示永不过期
+"""
+
+import os
+
+from .sqlite import database_options
+
+PROFILES = ('development', 'production')
+DEFAULT_CONN_MAX_AGE = 60
+
+
+def _int(env, name, default):
+    value = env.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def _conn_max_age(env, profile):
+    value = env.get('DB_CONN_MAX_AGE')
+    if value is None or value == '':
+        return DEFAULT_CONN_MAX_AGE if profile == 'production' else 0
+    if value.lower() == 'none':
+        return None
+    return int(value)
+
+
+def database_settings(base_dir, sqlite_profile='tuned', env=None):
+    """根据环境变量生成 DATABASES['default']"""
+    env = os.environ if env is None else env
+    engine = env.get('DB_ENGINE', 'sqlite')
+    profile = env.get('DB_PROFILE', 'development')
+    if profile not in PROFILES:
+        raise ValueError(f"未知的数据库配置: {profile}（可选: {', '.join(PROFILES)}）")
+
+    if engine == 'sqlite':
+        config = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': env.get('DB_NAME') or base_dir / 'db.sqlite3',
+            'OPTIONS': database_options(sqlite_profile),
+        }
+    elif engine == 'postgresql':
+        config = {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': env.get('DB_NAME', 'sample_data'),
+            'USER': env.get('DB_USER', ''),
+            'PASSWORD': env.get('DB_PASSWORD', ''),
+            'HOST': env.get('DB_HOST', 'localhost'),
+            'PORT': env.get('DB_PORT', '5432'),
+            'OPTIONS': {},
+        }
+    else:
+        raise ValueError(f"不支持的数据库: {engine}（可选: sqlite、postgresql）")
+
+    config['CONN_MAX_AGE'] = _conn_max_age(env, profile)
+    config['CONN_HEALTH_CHECKS'] = profile == 'production'
+
+    if env.get('DB_POOL') == '1':
+        if engine != 'postgresql':
+            raise ValueError("DB_POOL 只适用于 PostgreSQL")
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS']['pool'] = {
+            'min_size': _int(env, 'DB_POOL_MIN_SIZE', 2),
+            'max_size': _int(env, 'DB_POOL_MAX_SIZE', 10),
+            'timeout': _int(env, 'DB_POOL_TIMEOUT', 10),
+        }
+    return config
@@ -0,0 +1,347 @@
+"""
+流式、可断点续传的数据导入
+
+读取 exporter 生成的 JSON / JSON Lines 文件（.gz 自动解压），逐条解析而不是
+``json.load`` 整个文件，按批写入，每批一个事务。每提交一批就把进度写入检查点文件
+（``<文件名>.ckpt``），导入中断后再次运行会从最后提交的位置继续。
+
+- JSON Lines: 检查点记录已提交行之后的字节偏移，续传时直接 seek
+- JSON: 检查点记录每个部分已提交的记录数，续传时跳过这些记录
+
+每批提交前先在检查点中写入待提交标记（部分键名和该批结束处的记录数 / 偏移），提交后再更新进度、
+清除标记。提交和更新进度之间中断时，最后一批已经写入而进度还没有更新：续传时从进度处到标记处的记录
+（与本次的批大小无关）按自然键 upsert（见 sync.py），已经写入的记录不会重复插入，也不计入导入数。
+
+导出文件中的创建时间、更新时间和注册时间原样写回（导入期间临时关闭 auto_now /
+auto_now_add，见 preserve_timestamps()），缺少时间的旧导出文件使用导入时的时间。
+
+产品中的分类以名称引用，通过内存中的 {分类名: 主键} 表映射为新库中的主键。
+sync=True 时按自然键 upsert（见 sync.py），可以导入到已有数据的库中。
+"""
+
+import gzip
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .cache import bump_version
+from .exporter import EXPORT_SECTIONS, detect_format, open_text
+from .models import Category, Product, Customer
+from .stats import rebuild_category_stats
+from .sync import upsert_batch
+
+DEFAULT_BATCH_SIZE = 2000
+
+# 每提交多少批打印一次进度
+PROGRESS_EVERY = 10
+
+_SECTION_BY_MODEL = {model_name: key for key, model_name, _, _ in EXPORT_SECTIONS}
+_SECTION_ORDER = [key for key, _, _, _ in EXPORT_SECTIONS]
+
+
+class JSONSectionReader:
+    """
+    增量解析 {"categories": [...], "products": [...], ...} 格式的文件
+
+    逐条产出 (部分键名, 记录字典)，缓冲区中只保留尚未解析的数据。
+    """
+
+    WHITESPACE = ' \t\r\n'
+
+    def __init__(self, fh, read_size=1 << 16):
+        self.fh = fh
+        self.read_size = read_size
+        self.buffer = ''
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        data = self.fh.read(self.read_size)
+        if not data:
+            return False
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def _peek(self, skip=WHITESPACE):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in skip:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"JSON 格式错误：期望 {char!r}，实际为 {found!r}")
+        self.pos += 1
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, self.pos = self.decoder.raw_decode(self.buffer, self.pos)
+                return value
+            except json.JSONDecodeError:
+                # 当前缓冲区里的值不完整，读入更多数据后重试
+                if not self._fill():
+                    raise
+
+    def __iter__(self):
+        self._expect('{')
+        while True:
+            char = self._peek(self.WHITESPACE + ',')
+            if char == '}':
+                return
+            key = self._value()
+            self._expect(':')
+            self._expect('[')
+            while self._peek(self.WHITESPACE + ',') != ']':
+                yield key, self._value()
+            self.pos += 1
+
+
+def _open_binary(path):
+    if str(path).endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def _iter_jsonl(path, offset):
+    """逐行产出 (部分键名, 记录, 该行结束处的字节偏移)"""
+    with _open_binary(path) as fh:
+        fh.seek(offset)
+        for line in iter(fh.readline, b''):
+            offset += len(line)
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            yield _SECTION_BY_MODEL[record.pop('model')], record, offset
+
+
+def _iter_json(path, skip_counts):
+    """逐条产出 (部分键名, 记录, None)，跳过检查点中已提交的记录"""
+    seen = dict.fromkeys(_SECTION_ORDER, 0)
+    with open_text(path, 'r') as fh:
+        for key, record in JSONSectionReader(fh):
+            seen[key] += 1
+            if seen[key] <= skip_counts.get(key, 0):
+                continue
+            yield key, record, None
+
+
+class Checkpoint:
+    """
+    导入进度检查点：每批提交前后各原子地重写一次
+
+    pending 为正在提交的一批的结束位置 {'section': 部分键名, 'count': 记录数, 'offset': 字节偏移}，
+    没有未确认的批次时为 None。
+    """
+
+    def __init__(self, path):
+        self.path = f"{path}.ckpt"
+        self.counts = dict.fromkeys(_SECTION_ORDER, 0)
+        self.offset = 0
+        self.pending = None
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, encoding='utf-8') as fh:
+            state = json.load(fh)
+        self.counts.update(state.get('counts', {}))
+        self.offset = state.get('offset', 0)
+        self.pending = state.get('pending')
+        return True
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump({'counts': self.counts, 'offset': self.offset, 'pending': self.pending}, fh)
+        os.replace(tmp_path, self.path)
+
+    def is_pending(self, section, position):
+        """某部分第 position 条（从 0 开始）记录是否属于可能已提交的批次"""
+        return (self.pending is not None and section == self.pending['section']
+                and position < self.pending['count'])
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+@contextmanager
+def preserve_timestamps(*models):
+    """
+    临时关闭这些模型的 auto_now / auto_now_add，让实例上已有的时间写入数据库
+
+    修改的是字段定义，对整个进程生效，只在导入这类独占的批处理中使用。
+    """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _datetime(record, key, default):
+    value = record.get(key)
+    return (parse_datetime(value) if value else None) or default
+
+
+def _build_category(record, lookup, now):
+    return Category(
+        name=record['name'],
+        description=record.get('description', ''),
+        created_at=_datetime(record, 'created_at', now),
+    )
+
+
+def _build_product(record, lookup, now):
+    category_id = lookup.get(record['category'])
+    if category_id is None:
+        return None
+    return Product(
+        name=record['name'],
+        description=record.get('description', ''),
+        price=record['price'],
+        stock_quantity=record.get('stock_quantity', 0),
+        status=record.get('status', 'available'),
+        category_id=category_id,
+        created_at=_datetime(record, 'created_at', now),
+        updated_at=_datetime(record, 'updated_at', now),
+    )
+
+
+def _build_customer(record, lookup, now):
+    return Customer(
+        name=record['name'],
+        email=record['email'],
+        phone=record.get('phone', ''),
+        address=record.get('address', ''),
+        date_joined=_datetime(record, 'date_joined', now),
+    )
+
+
+_BUILDERS = {
+    'categories': (Category, _build_category),
+    'products': (Product, _build_product),
+    'customers': (Customer, _build_customer),
+}
+
+
+def import_data(path, fmt=None, batch_size=DEFAULT_BATCH_SIZE, resume=True, sync=False, verbose=True):
+    """
+    从 path 导入数据，返回 {部分键名: 导入记录数}
+
+    resume=True 时从检查点继续；全部完成后删除检查点文件。
+    """
+    fmt = fmt or detect_format(path)
+    checkpoint = Checkpoint(path)
+    if resume and checkpoint.load():
+        if verbose:
+            done = '，'.join(f"{key} {count} 条" for key, count in checkpoint.counts.items())
+            print(f"  从检查点继续导入（已完成: {done}）")
+    else:
+        checkpoint.clear()
+
+    if fmt == 'jsonl':
+        records = _iter_jsonl(path, checkpoint.offset)
+    else:
+        records = _iter_json(path, checkpoint.counts)
+
+    lookup = {}
+    imported = dict.fromkeys(_SECTION_ORDER, 0)
+    skipped = dict.fromkeys(_SECTION_ORDER, 0)
+    batches = [0]
+    start = time.perf_counter()
+
+    def flush(section, batch, offset, recovering=False):
+        model, build = _BUILDERS[section]
+        if section == 'products' and not lookup:
+            lookup.update(Category.objects.values_list('name', 'id'))
+        now = timezone.now()
+        instances = []
+        for record in batch:
+            instance = build(record, lookup, now)
+            if instance is None:
+                skipped[section] += 1
+            else:
+                instances.append(instance)
+        if recovering:
+            # 标记处之前的记录可能已经提交过（见模块说明），只统计实际新增的记录
+            created, _, _ = upsert_batch(model, instances)
+            imported[section] += created
+        else:
+            checkpoint.pending = {'section': section, 'count': checkpoint.counts[section] + len(batch),
+                                  'offset': offset}
+            checkpoint.save()
+            if sync:
+                upsert_batch(model, instances)
+            else:
+                with transaction.atomic():
+                    model.objects.bulk_create(instances, batch_size=batch_size)
+                bump_version(model)
+            imported[section] += len(instances)
+        # 事务提交后再记录进度，保证检查点之前的数据一定已写入
+        checkpoint.counts[section] += len(batch)
+        if offset is not None:
+            checkpoint.offset = offset
+        if not recovering or not checkpoint.is_pending(section, checkpoint.counts[section]):
+            checkpoint.pending = None
+        checkpoint.save()
+        if section == 'categories':
+            lookup.clear()
+        batches[0] += 1
+        if verbose and batches[0] % PROGRESS_EVERY == 0:
+            elapsed = time.perf_counter() - start
+            total = sum(imported.values())
+            rate = total / elapsed if elapsed else 0.0
+            print(f"  {model._meta.verbose_name}: 已导入 {imported[section]} 条"
+                  f"（累计 {total} 条，{rate:,.0f} 条/秒）")
+
+    section, batch, offset, recovering = None, [], None, False
+    position = dict(checkpoint.counts)
+    with preserve_timestamps(Category, Product, Customer):
+        for key, record, record_offset in records:
+            pending = checkpoint.is_pending(key, position[key])
+            position[key] += 1
+            if (key != section or len(batch) >= batch_size or pending != recovering) and batch:
+                flush(section, batch, offset, recovering)
+                batch = []
+            section, recovering = key, pending
+            batch.append(record)
+            offset = record_offset
+        if batch:
+            flush(section, batch, offset, recovering)
+
+    checkpoint.clear()
+    if imported['categories'] or imported['products']:
+        rebuild_category_stats(verbose=verbose)
+    if verbose:
+        elapsed = time.perf_counter() - start
+        total = sum(imported.values())
+        rate = total / elapsed if elapsed else 0.0
+        for key in _SECTION_ORDER:
+            model = _BUILDERS[key][0]
+            line = f"  ✓ {model._meta.verbose_name}: 导入 {imported[key]} 条"
+            if skipped[key]:
+                line += f"，{skipped[key]} 条因找不到分类而跳过"
+            print(line)
+        print(f"  导入完成: 共 {total} 条，耗时 {elapsed:.2f} 秒（{rate:,.0f} 条/秒）")
+    return imported
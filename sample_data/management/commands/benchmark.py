@@ -0,0 +1,299 @@
+"""
+性能基准测试
+
+    python manage.py benchmark                          # 1 万、10 万、100 万个产品
+    python manage.py benchmark --sizes 10000 --repeat 50
+    python manage.py benchmark --compare benchmarks/results/上次的结果.json
+
+对每个数据规模依次测量：合成数据、管理后台变更列表（含搜索和过滤）、JSON API
+（不使用缓存和使用缓存两种情况）、导出、清空数据表、导入。耗时类用例记录 p50 / p99
+延迟和每秒次数，吞吐类用例记录每秒行数，并记录每个阶段内的峰值常驻内存及其相对阶段开始时的增长。
+结果连同 git 提交号写入 JSON 文件，可以用 --compare 与另一次的结果对比。
+
+注意：会清空并重新生成当前数据库中的分类、产品和客户数据。
+"""
+
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlencode
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+
+from benchmarks.common import admin_client, seed_dataset, summarize, timed
+from sample_data import exporter, importer
+from sample_data.models import Category, Product, Customer
+from sample_data.reset import reset_tables
+from sample_data.views import encode_cursor
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+RESULTS_DIR = os.path.join(settings.BASE_DIR, 'benchmarks', 'results')
+
+NO_CACHE_ALIAS = 'benchmark-nocache'
+
+
+def current_rss_mb():
+    """当前常驻内存（MB），读取 /proc/self/statm，不支持的平台返回 None"""
+    try:
+        with open('/proc/self/statm') as fh:
+            pages = int(fh.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+
+class MemorySampler:
+    """
+    在后台线程中定期采样当前常驻内存，得到一个阶段内的峰值
+
+    getrusage 的 ru_maxrss 是整个进程至今的峰值，后面的阶段只会看到前面阶段中最大的值，
+    所以这里逐个阶段采样。不用 tracemalloc：它会明显拖慢被测代码。
+    """
+
+    interval = 0.01
+
+    def __init__(self):
+        self.start = self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None and rss > self.peak:
+            self.peak = rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self.start = self.peak = current_rss_mb()
+        if self.start is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+
+    def result(self):
+        """{'peak_rss_mb': 阶段内峰值, 'rss_growth_mb': 峰值 - 阶段开始时}"""
+        if self.start is None:
+            return {'peak_rss_mb': None, 'rss_growth_mb': None}
+        return {'peak_rss_mb': round(self.peak, 1), 'rss_growth_mb': round(self.peak - self.start, 1)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def latency(samples):
+    stats = summarize(samples)
+    total = sum(samples)
+    stats['ops_per_second'] = round(len(samples) / total, 1) if total else 0.0
+    return stats
+
+
+def throughput(rows, elapsed):
+    return {
+        'rows': rows,
+        'elapsed_s': round(elapsed, 3),
+        'rows_per_second': round(rows / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def admin_cases():
+    product = Product.objects.order_by('id').values('name', 'category_id').first()
+    customer = Customer.objects.order_by('id').values('name').first()
+    term = product['name'].split()[1] if product and len(product['name'].split()) > 1 else '手机'
+    return [
+        ('产品列表', '/admin/sample_data/product/'),
+        ('产品 搜索', '/admin/sample_data/product/?' + urlencode({'q': term})),
+        ('产品 按状态', '/admin/sample_data/product/?status__exact=out_of_stock'),
+        ('产品 按分类', f"/admin/sample_data/product/?category__id__exact={product['category_id'] if product else 1}"),
+        ('客户列表', '/admin/sample_data/customer/'),
+        ('客户 搜索', '/admin/sample_data/customer/?' + urlencode({'q': customer['name'] if customer else '张三'})),
+        ('分类列表', '/admin/sample_data/category/'),
+    ]
+
+
+def api_cases():
+    ids = Product.objects.order_by('id').values_list('id', flat=True)
+    middle = ids[ids.count() // 2] if ids.exists() else 1
+    return [
+        ('产品 第一页', '/api/products/?limit=50'),
+        ('产品 中间页', '/api/products/?' + urlencode({'limit': 50, 'cursor': encode_cursor(middle)})),
+        ('产品 按更新时间', '/api/products/?order=updated_at&limit=50'),
+        ('产品 按状态', '/api/products/?status=out_of_stock&limit=50'),
+        ('产品 详情', f'/api/products/{middle}/'),
+        ('分类统计', '/api/categories/stats/'),
+        ('客户 第一页', '/api/customers/?limit=50'),
+        ('变更流', '/api/changes/?limit=500'),
+    ]
+
+
+def run_requests(client, cases, repeat):
+    results = {}
+    for name, url in cases:
+        response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f"{url} 返回 {response.status_code}")
+        results[name] = latency(timed(lambda: client.get(url), repeat=repeat))
+    return results
+
+
+class Command(BaseCommand):
+    help = '测量数据生成、管理后台、API、导入导出等关键路径的性能，结果写入 JSON 文件'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                            help='产品数量（默认 10000 100000 1000000）')
+        parser.add_argument('--repeat', type=int, default=20, help='每个耗时用例的重复次数（默认 20）')
+        parser.add_argument('--batch-size', type=int, default=5000, help='合成数据的批次大小')
+        parser.add_argument('--output', help='结果文件（默认 benchmarks/results/<时间>-<提交号>.json）')
+        parser.add_argument('--compare', help='与之前的结果文件对比')
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive',
+                            help='不询问确认')
+
+    def handle(self, *args, **options):
+        if options['interactive']:
+            answer = input("基准测试会清空当前数据库中的分类、产品和客户数据，确定继续吗？[y/N] ")
+            if answer.strip().lower() not in ('y', 'yes'):
+                self.stdout.write("已取消")
+                return
+
+        commit = git_commit()
+        report = {
+            'meta': {
+                'commit': commit,
+                'started_at': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'vendor': connection.vendor,
+                'repeat': options['repeat'],
+            },
+            'sizes': {},
+        }
+        for size in options['sizes']:
+            self.stdout.write(f"\n=== {size} 个产品 ===")
+            report['sizes'][str(size)] = self.run_size(size, options['repeat'], options['batch_size'])
+
+        output = options['output']
+        if not output:
+            os.makedirs(RESULTS_DIR, exist_ok=True)
+            stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+            output = os.path.join(RESULTS_DIR, f"{stamp}-{commit or 'unknown'}.json")
+        with open(output, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2)
+        self.stdout.write(f"\n结果已写入 {output}")
+
+        if options['compare']:
+            self.compare(options['compare'], report)
+
+    def run_size(self, size, repeat, batch_size):
+        result = {}
+
+        self.stdout.write("合成数据...")
+        with MemorySampler() as memory:
+            start = time.perf_counter()
+            inserted = seed_dataset(size, batch_size=batch_size, verbose=False)
+            elapsed = time.perf_counter() - start
+        rows = sum(r.inserted for r in inserted.values())
+        result['generation'] = throughput(rows, elapsed)
+        result['generation'].update(memory.result())
+
+        self.stdout.write("管理后台变更列表...")
+        with MemorySampler() as memory, admin_client() as client:
+            result['admin'] = run_requests(client, admin_cases(), repeat)
+
+            self.stdout.write("JSON API（不使用缓存）...")
+            caches = {**settings.CACHES, NO_CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+            with override_settings(CACHES=caches, API_CACHE_ALIAS=NO_CACHE_ALIAS, CHANGEFEED_SAFETY_WINDOW=0):
+                result['api'] = run_requests(client, api_cases(), repeat)
+            self.stdout.write("JSON API（使用缓存）...")
+            with override_settings(CHANGEFEED_SAFETY_WINDOW=0):
+                result['api_cached'] = run_requests(client, api_cases(), repeat)
+        result['requests_memory'] = memory.result()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'export.jsonl')
+
+            self.stdout.write("导出...")
+            with MemorySampler() as memory:
+                start = time.perf_counter()
+                counts = exporter.export_data(path, chunk_size=batch_size, verbose=False)
+                elapsed = time.perf_counter() - start
+            result['export'] = throughput(sum(counts.values()), elapsed)
+            result['export']['bytes'] = os.path.getsize(path)
+            result['export'].update(memory.result())
+
+            self.stdout.write("清空数据表...")
+            tables = {model._meta.db_table: model.objects.count() for model in (Product, Customer, Category)}
+            start = time.perf_counter()
+            timings = reset_tables(verbose=False)
+            result['reset'] = throughput(sum(tables.values()), time.perf_counter() - start)
+            result['reset']['tables'] = {
+                model._meta.db_table: round(elapsed, 4) for model, elapsed in timings
+            }
+
+            self.stdout.write("导入...")
+            with MemorySampler() as memory:
+                start = time.perf_counter()
+                counts = importer.import_data(path, batch_size=batch_size, resume=False, verbose=False)
+                elapsed = time.perf_counter() - start
+            result['import'] = throughput(sum(counts.values()), elapsed)
+            result['import'].update(memory.result())
+
+        self.print_size(result)
+        return result
+
+    def print_size(self, result):
+        for key in ('generation', 'export', 'reset', 'import'):
+            r = result[key]
+            line = f"  {key:<12}{r['rows']:>10} 行  {r['elapsed_s']:>8.2f} 秒  {r['rows_per_second']:>12,.0f} 行/秒"
+            if r.get('peak_rss_mb') is not None:
+                line += f"  内存峰值 {r['peak_rss_mb']:.0f} MB（+{r['rss_growth_mb']:.0f}）"
+            self.stdout.write(line)
+        for group in ('admin', 'api', 'api_cached'):
+            for name, r in result[group].items():
+                self.stdout.write(f"  {group:<12}{name:<14}p50 {r['p50_ms']:>8.2f} ms  "
+                                  f"p99 {r['p99_ms']:>8.2f} ms  {r['ops_per_second']:>8.1f} 次/秒")
+
+    def compare(self, path, report):
+        with open(path, encoding='utf-8') as fh:
+            baseline = json.load(fh)
+        self.stdout.write(f"\n与 {path}（提交 {baseline['meta'].get('commit')}）对比，比值 = 本次 / 之前：")
+        for size, current in report['sizes'].items():
+            previous = baseline['sizes'].get(size)
+            if not previous:
+                continue
+            self.stdout.write(f"  {size} 个产品:")
+            for key in ('generation', 'export', 'reset', 'import'):
+                if key in previous:
+                    before, after = previous[key]['rows_per_second'], current[key]['rows_per_second']
+                    ratio = after / before if before else 0.0
+                    self.stdout.write(f"    {key:<14}{before:>12,.0f} -> {after:>12,.0f} 行/秒  ×{ratio:.2f}")
+            for group in ('admin', 'api', 'api_cached'):
+                for name, r in current[group].items():
+                    old = previous.get(group, {}).get(name)
+                    if old:
+                        ratio = r['p50_ms'] / old['p50_ms'] if old['p50_ms'] else 0.0
+                        self.stdout.write(f"    {group}/{name:<14}p50 {old['p50_ms']:>8.2f} -> "
+                                          f"{r['p50_ms']:>8.2f} ms  ×{ratio:.2f}")
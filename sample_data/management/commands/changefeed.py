@@ -0,0 +1,96 @@
+"""
+输出增量变更流（JSON Lines）
+
+    python manage.py changefeed --cursor-file sync.cursor --output changes.jsonl
+
+每输出一页就把游标写入 --cursor-file，中断后重新运行同一条命令即可继续；
+第一次运行（游标文件不存在）时从 --since 指定的时间开始，未指定则从头开始。
+"""
+
+import json
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from sample_data import changefeed
+from sample_data.views import ApiJSONEncoder, decode_cursor, encode_cursor, BadRequest
+
+
+def _write_atomic(path, text):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class Command(BaseCommand):
+    help = '按游标输出分类、产品、客户的增量变化（包括删除）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='从该时间（ISO 8601）之后开始')
+        parser.add_argument('--cursor', help='从上次输出的游标继续')
+        parser.add_argument('--cursor-file', help='读取并保存游标的文件，用于断点续传')
+        parser.add_argument('--output', help='输出文件（追加写入），默认输出到标准输出')
+        parser.add_argument('--limit', type=int, default=changefeed.DEFAULT_PAGE_SIZE,
+                            help=f'每页条数（默认 {changefeed.DEFAULT_PAGE_SIZE}）')
+        parser.add_argument('--window', type=float, default=None,
+                            help='安全窗口秒数，只输出早于“当前时间 - 窗口”的变化')
+
+    def initial_positions(self, options):
+        cursor = options['cursor']
+        cursor_file = options['cursor_file']
+        if not cursor and cursor_file and os.path.exists(cursor_file):
+            with open(cursor_file, encoding='utf-8') as f:
+                cursor = f.read().strip()
+        if cursor:
+            try:
+                return decode_cursor(cursor)
+            except BadRequest as e:
+                raise CommandError(str(e))
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError("--since 必须是 ISO 8601 时间")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            return changefeed.initial_positions(since)
+        return {}
+
+    def handle(self, *args, **options):
+        positions = self.initial_positions(options)
+        limit = max(1, options['limit'])
+        output = open(options['output'], 'a', encoding='utf-8') if options['output'] else sys.stdout
+        counts = {}
+        pages = 0
+        try:
+            while True:
+                try:
+                    changes, positions, has_more = changefeed.read_changes(
+                        positions, limit, window=options['window'],
+                    )
+                except changefeed.InvalidCursor as e:
+                    raise CommandError(str(e))
+                for change in changes:
+                    output.write(json.dumps(change, cls=ApiJSONEncoder, ensure_ascii=False))
+                    output.write('\n')
+                    key = f"{change['model']} {change['op']}"
+                    counts[key] = counts.get(key, 0) + 1
+                output.flush()
+                pages += 1
+                # 数据写出之后再保存游标，中断时最多重复输出一页，不会遗漏
+                cursor = encode_cursor(positions)
+                if options['cursor_file']:
+                    _write_atomic(options['cursor_file'], cursor)
+                if not has_more:
+                    break
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        total = sum(counts.values())
+        detail = '，'.join(f"{key} {count} 条" for key, count in sorted(counts.items()))
+        self.stderr.write(f"✓ 共输出 {total} 条变化（{pages} 页）{'：' + detail if detail else ''}")
+        self.stderr.write(f"  游标: {cursor}")
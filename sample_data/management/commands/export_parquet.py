@@ -0,0 +1,43 @@
+"""
+导出分析用的 Parquet 文件（见 sample_data/columnar.py）
+
+    python manage.py export_parquet                      # 导出到 data_scripts/parquet/
+    python manage.py export_parquet /data/catalog --compression snappy
+"""
+
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+try:
+    from sample_data import columnar
+except ImportError as e:
+    # 缺少 pandas / pyarrow 时命令仍可加载，执行时给出提示
+    columnar = None
+    IMPORT_ERROR = e
+
+DEFAULT_DIRECTORY = os.path.join(settings.BASE_DIR, 'data_scripts', 'parquet')
+
+
+class Command(BaseCommand):
+    help = '把分类、产品和客户导出为带类型、按分类分区的 Parquet 文件'
+
+    def add_arguments(self, parser):
+        chunk_size = getattr(columnar, 'DEFAULT_CHUNK_SIZE', None)
+        row_group_size = getattr(columnar, 'ROW_GROUP_SIZE', None)
+        compression = getattr(columnar, 'DEFAULT_COMPRESSION', None)
+        parser.add_argument('directory', nargs='?', default=DEFAULT_DIRECTORY,
+                            help='输出目录（其中的 categories/、products/、customers/ 会被覆盖），默认 data_scripts/parquet/')
+        parser.add_argument('--chunk-size', type=int, default=chunk_size,
+                            help=f'每次从数据库读取的行数（默认 {chunk_size}）')
+        parser.add_argument('--row-group-size', type=int, default=row_group_size,
+                            help=f'每个行组的行数（默认 {row_group_size}）')
+        parser.add_argument('--compression', default=compression, choices=getattr(columnar, 'COMPRESSIONS', None),
+                            help=f'压缩方式（默认 {compression}）')
+
+    def handle(self, *args, **options):
+        if columnar is None:
+            raise CommandError(f"导出 Parquet 需要安装 pandas 和 pyarrow: {IMPORT_ERROR}")
+        columnar.export_parquet(options['directory'], chunk_size=options['chunk_size'],
+                                compression=options['compression'], row_group_size=options['row_group_size'])
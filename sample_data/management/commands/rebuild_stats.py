@@ -0,0 +1,36 @@
+"""
+重建分类统计
+
+    python manage.py rebuild_stats                  # 全部分类
+    python manage.py rebuild_stats --category 电子产品
+
+库存预留不更新分类统计中的库存总值和缺货数（见 sample_data/stats.py），
+可以用 cron 等定期运行这个命令让它们追上预留。
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sample_data.models import Category
+from sample_data.stats import rebuild_category_stats
+
+
+class Command(BaseCommand):
+    help = '用一次 GROUP BY 重建分类统计（产品数、缺货数、库存总值、价格区间）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--category', action='append', default=[],
+                            help='分类 id 或名称，可重复指定；不指定时为全部分类')
+
+    def resolve_categories(self, values):
+        ids = []
+        for value in values:
+            category = Category.objects.filter(pk=int(value)).first() if value.isdigit() else None
+            category = category or Category.objects.filter(name=value).first()
+            if category is None:
+                raise CommandError(f"找不到分类: {value}")
+            ids.append(category.pk)
+        return ids
+
+    def handle(self, *args, **options):
+        category_ids = self.resolve_categories(options['category']) if options['category'] else None
+        rebuild_category_stats(category_ids, verbose=options['verbosity'] > 0)
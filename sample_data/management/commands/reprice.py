@@ -0,0 +1,63 @@
+"""
+批量调价 / 修改产品状态
+
+    python manage.py reprice --percent 10                        # 全部产品涨价 10%
+    python manage.py reprice --category 电子产品 --amount -50     # 电子产品每件降价 50 元
+    python manage.py reprice --status out_of_stock --set-status discontinued
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sample_data import pricing
+from sample_data.models import Category, Product
+
+
+class Command(BaseCommand):
+    help = '按分类 / 状态筛选产品，批量调整价格或修改状态'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--category', action='append', default=[],
+                            help='分类 id 或名称，可重复指定；不指定时为全部分类')
+        parser.add_argument('--status', choices=pricing.PRODUCT_STATUSES, help='只处理该状态的产品')
+        parser.add_argument('--percent', type=float, help='调价百分比，例如 10 表示涨价 10%%，-20 表示降价 20%%')
+        parser.add_argument('--amount', type=float, help='每件调整的金额，可以为负数')
+        parser.add_argument('--set-status', choices=pricing.PRODUCT_STATUSES, help='把产品状态改为该值')
+        parser.add_argument('--chunk-size', type=int, default=pricing.DEFAULT_CHUNK_SIZE,
+                            help=f'每个事务处理的主键区间大小（默认 {pricing.DEFAULT_CHUNK_SIZE}）')
+        parser.add_argument('--dry-run', action='store_true', help='只统计会被处理的产品数量')
+
+    def resolve_categories(self, values):
+        ids = []
+        for value in values:
+            category = Category.objects.filter(pk=int(value)).first() if value.isdigit() else None
+            category = category or Category.objects.filter(name=value).first()
+            if category is None:
+                raise CommandError(f"找不到分类: {value}")
+            ids.append(category.pk)
+        return ids
+
+    def handle(self, *args, **options):
+        if options['percent'] is None and options['amount'] is None and not options['set_status']:
+            raise CommandError("请至少指定 --percent、--amount 或 --set-status 之一")
+
+        queryset = Product.objects.all()
+        if options['category']:
+            queryset = queryset.filter(category_id__in=self.resolve_categories(options['category']))
+        if options['status']:
+            queryset = queryset.filter(status=options['status'])
+
+        if options['dry_run']:
+            self.stdout.write(f"将处理 {queryset.count()} 个产品")
+            return
+
+        chunk_size = max(1, options['chunk_size'])
+        try:
+            if options['percent'] is not None or options['amount'] is not None:
+                self.stdout.write("调整价格...")
+                pricing.reprice(queryset, percent=options['percent'], amount=options['amount'],
+                                chunk_size=chunk_size)
+            if options['set_status']:
+                self.stdout.write(f"修改状态为 {options['set_status']}...")
+                pricing.set_status(queryset, options['set_status'], chunk_size=chunk_size)
+        except ValueError as e:
+            raise CommandError(str(e))
@@ -0,0 +1,173 @@
+"""
+SQL 查询统计中间件
+
+通过 execute_wrapper 记录每个请求执行的查询，不依赖 DEBUG 和调试工具栏，
+可以在生产环境开启：
+
+- 查询次数、数据库总耗时、最慢的几条语句、重复执行的语句（N+1 查询的典型特征）
+- 响应头 ``Server-Timing: db;dur=..., app;dur=...``（settings.QUERY_TIMING_HEADER，默认跟随 DEBUG）
+- 每个请求一行 JSON 日志，写入 ``sample_data.queries`` 日志器（INFO 级别；
+  超出查询预算时为 WARNING）
+- 查询预算: settings.QUERY_BUDGET（默认不限制），单个视图可以用 @query_budget(n) 覆盖；
+  settings.QUERY_BUDGET_RAISE = True 时超出预算直接抛出 QueryBudgetExceeded，用于让测试失败
+
+日志只记录带占位符的 SQL，不记录参数。
+
+数据库连接是线程本地的，而异步视图的查询在 sync_to_async 的线程中执行，
+所以不在请求开始时给连接装 execute_wrapper，而是在每个连接建立时（connection_created）
+装上 record_queries，由它把查询交给当前请求的记录器。记录器保存在 contextvar 中，
+会随 sync_to_async 传到执行查询的线程，同步和异步请求都能统计到。
+"""
+
+import contextvars
+import json
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger('sample_data.queries')
+
+DEFAULT_SLOWEST = 3
+SQL_PREVIEW_LENGTH = 200
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(limit):
+    """为单个视图指定查询预算"""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+_current_recorder = contextvars.ContextVar('sample_data_query_recorder', default=None)
+
+
+def record_queries(execute, sql, params, many, context):
+    """装在每个连接上的 execute_wrapper，把查询交给当前请求的记录器"""
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_recorder(sender, connection, **kwargs):
+    """connection_created 信号处理；放在最前面，不影响 ``with connection.execute_wrapper()`` 的出栈"""
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_queries)
+
+
+class QueryRecorder:
+    """execute_wrapper 回调：统计执行过的查询（一个请求的查询可能在多个线程中执行）"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.count += 1
+                self.duration += elapsed
+                calls, total, slowest = self.statements.get(sql, (0, 0.0, 0.0))
+                self.statements[sql] = (calls + 1, total + elapsed, max(slowest, elapsed))
+
+    def slowest(self, n=DEFAULT_SLOWEST):
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][2], reverse=True)
+        return [
+            {'sql': sql[:SQL_PREVIEW_LENGTH], 'ms': round(slowest * 1000, 3)}
+            for sql, (_, _, slowest) in ranked[:n]
+        ]
+
+    def duplicates(self, n=DEFAULT_SLOWEST):
+        repeated = [(sql, calls) for sql, (calls, _, _) in self.statements.items() if calls > 1]
+        repeated.sort(key=lambda item: item[1], reverse=True)
+        return [{'sql': sql[:SQL_PREVIEW_LENGTH], 'count': calls} for sql, calls in repeated[:n]]
+
+
+class QueryInstrumentationMiddleware:
+    """记录每个请求的查询次数和耗时，见模块说明；同时支持 WSGI 和 ASGI"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.header = getattr(settings, 'QUERY_TIMING_HEADER', settings.DEBUG)
+        self.default_budget = getattr(settings, 'QUERY_BUDGET', None)
+        self.raise_on_budget = getattr(settings, 'QUERY_BUDGET_RAISE', False)
+        self.slowest = getattr(settings, 'QUERY_LOG_SLOWEST', DEFAULT_SLOWEST)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        token = _current_recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self.finish(request, response, recorder, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        token = _current_recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self.finish(request, response, recorder, time.perf_counter() - start)
+
+    def get_budget(self, request):
+        # @query_budget 设置在视图函数上；在这里读取而不是用 process_view，
+        # 异步请求不必为一个同步的 process_view 切换线程
+        match = getattr(request, 'resolver_match', None)
+        if match is not None:
+            return getattr(match.func, 'query_budget', self.default_budget)
+        return self.default_budget
+
+    def finish(self, request, response, recorder, total):
+        budget = self.get_budget(request)
+        over_budget = budget is not None and recorder.count > budget
+        if self.header:
+            db_ms = recorder.duration * 1000
+            response['Server-Timing'] = (
+                f'db;dur={db_ms:.2f};desc="{recorder.count} queries", '
+                f'app;dur={total * 1000 - db_ms:.2f}'
+            )
+
+        level = logging.WARNING if over_budget else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'queries': recorder.count,
+                'db_ms': round(recorder.duration * 1000, 3),
+                'total_ms': round(total * 1000, 3),
+                'budget': budget,
+                'slowest': recorder.slowest(self.slowest),
+                'duplicates': recorder.duplicates(self.slowest),
+            }, ensure_ascii=False))
+
+        if over_budget and self.raise_on_budget:
+            raise QueryBudgetExceeded(
+                f"{request.method} {request.path} 执行了 {recorder.count} 条查询，超出预算 {budget} 条"
+            )
+        return response
@@ -0,0 +1,102 @@
+from django.db import migrations
+
+# 建立全文索引的 SQL 按本迁移编写时的 sample_data/search.py 固定在这里，
+# 之后修改 search.py 不会改变这个迁移的行为
+
+SQLITE_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS sample_data_product_fts USING fts5("
+    "name, description, content='sample_data_product', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS sample_data_product_fts_ai AFTER INSERT ON sample_data_product BEGIN "
+    "INSERT INTO sample_data_product_fts(rowid, name, description) VALUES (new.id, new.name, new.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS sample_data_product_fts_ad AFTER DELETE ON sample_data_product BEGIN "
+    "INSERT INTO sample_data_product_fts(sample_data_product_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS sample_data_product_fts_au AFTER UPDATE OF name, description "
+    "ON sample_data_product BEGIN "
+    "INSERT INTO sample_data_product_fts(sample_data_product_fts, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO sample_data_product_fts(rowid, name, description) VALUES (new.id, new.name, new.description); "
+    "END",
+    "INSERT INTO sample_data_product_fts(sample_data_product_fts) VALUES ('rebuild')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS sample_data_customer_fts USING fts5("
+    "name, email, content='sample_data_customer', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS sample_data_customer_fts_ai AFTER INSERT ON sample_data_customer BEGIN "
+    "INSERT INTO sample_data_customer_fts(rowid, name, email) VALUES (new.id, new.name, new.email); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS sample_data_customer_fts_ad AFTER DELETE ON sample_data_customer BEGIN "
+    "INSERT INTO sample_data_customer_fts(sample_data_customer_fts, rowid, name, email) "
+    "VALUES ('delete', old.id, old.name, old.email); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS sample_data_customer_fts_au AFTER UPDATE OF name, email "
+    "ON sample_data_customer BEGIN "
+    "INSERT INTO sample_data_customer_fts(sample_data_customer_fts, rowid, name, email) "
+    "VALUES ('delete', old.id, old.name, old.email); "
+    "INSERT INTO sample_data_customer_fts(rowid, name, email) VALUES (new.id, new.name, new.email); "
+    "END",
+    "INSERT INTO sample_data_customer_fts(sample_data_customer_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS sample_data_product_fts_ai",
+    "DROP TRIGGER IF EXISTS sample_data_product_fts_ad",
+    "DROP TRIGGER IF EXISTS sample_data_product_fts_au",
+    "DROP TABLE IF EXISTS sample_data_product_fts",
+    "DROP TRIGGER IF EXISTS sample_data_customer_fts_ai",
+    "DROP TRIGGER IF EXISTS sample_data_customer_fts_ad",
+    "DROP TRIGGER IF EXISTS sample_data_customer_fts_au",
+    "DROP TABLE IF EXISTS sample_data_customer_fts",
+]
+
+POSTGRES_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    'CREATE INDEX IF NOT EXISTS sample_data_product_name_trgm ON "sample_data_product" '
+    'USING gin ((UPPER("name"::text)) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS sample_data_product_description_trgm ON "sample_data_product" '
+    'USING gin ((UPPER("description"::text)) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS sample_data_customer_name_trgm ON "sample_data_customer" '
+    'USING gin ((UPPER("name"::text)) gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS sample_data_customer_email_trgm ON "sample_data_customer" '
+    'USING gin ((UPPER("email"::text)) gin_trgm_ops)',
+]
+
+POSTGRES_REVERSE_SQL = [
+    "DROP INDEX IF EXISTS sample_data_product_name_trgm",
+    "DROP INDEX IF EXISTS sample_data_product_description_trgm",
+    "DROP INDEX IF EXISTS sample_data_customer_name_trgm",
+    "DROP INDEX IF EXISTS sample_data_customer_email_trgm",
+]
+
+
+class VendorRunSQL(migrations.RunSQL):
+    """只在 vendor 对应的数据库上执行的 RunSQL，其他数据库上跳过"""
+
+    def __init__(self, vendor, sql, reverse_sql=None, **kwargs):
+        self.vendor = vendor
+        super().__init__(sql, reverse_sql, **kwargs)
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        kwargs['vendor'] = self.vendor
+        return name, args, kwargs
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sample_data', '0003_admin_indexes'),
+    ]
+
+    operations = [
+        VendorRunSQL('sqlite', SQLITE_SQL, SQLITE_REVERSE_SQL),
+        VendorRunSQL('postgresql', POSTGRES_SQL, POSTGRES_REVERSE_SQL),
+    ]
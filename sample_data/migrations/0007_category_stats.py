@@ -0,0 +1,67 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Max, Min, Q, Sum
+
+
+def populate_category_stats(apps, schema_editor):
+    """为已有数据计算一次分类统计"""
+    Category = apps.get_model('sample_data', 'Category')
+    CategoryStats = apps.get_model('sample_data', 'CategoryStats')
+    Product = apps.get_model('sample_data', 'Product')
+    db = schema_editor.connection.alias
+
+    money = models.DecimalField(max_digits=20, decimal_places=2)
+    aggregates = {
+        row['category_id']: row
+        for row in Product.objects.using(db).order_by().values('category_id').annotate(
+            product_count=Count('id'),
+            out_of_stock_count=Count('id', filter=Q(status='out_of_stock')),
+            stock_value=Sum(F('price') * F('stock_quantity'), output_field=money),
+            price_total=Sum('price', output_field=money),
+            min_price=Min('price'),
+            max_price=Max('price'),
+        )
+    }
+    stats = []
+    for category_id in Category.objects.using(db).values_list('pk', flat=True):
+        row = aggregates.get(category_id, {})
+        stats.append(CategoryStats(
+            category_id=category_id,
+            product_count=row.get('product_count', 0),
+            out_of_stock_count=row.get('out_of_stock_count', 0),
+            stock_value=row.get('stock_value') or 0,
+            price_total=row.get('price_total') or 0,
+            min_price=row.get('min_price'),
+            max_price=row.get('max_price'),
+        ))
+    CategoryStats.objects.using(db).bulk_create(stats, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sample_data', '0006_change_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStats',
+            fields=[
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='sample_data.category', verbose_name='分类')),
+                ('product_count', models.IntegerField(default=0, verbose_name='产品数')),
+                ('out_of_stock_count', models.IntegerField(default=0, verbose_name='缺货产品数')),
+                ('stock_value', models.DecimalField(decimal_places=2, default=0, max_digits=20, verbose_name='库存总值')),
+                ('price_total', models.DecimalField(decimal_places=2, default=0, max_digits=20, verbose_name='价格合计')),
+                ('min_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='最低价格')),
+                ('max_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='最高价格')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '分类统计',
+                'verbose_name_plural': '分类统计',
+            },
+        ),
+        migrations.RunPython(populate_category_stats, migrations.RunPython.noop),
+    ]
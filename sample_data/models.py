@@ -1,13 +1,19 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import models, router, transaction
 
 class Category(models.Model):
-    name = models.CharField(max_length=100, verbose_name="分类名称")
+    name = models.CharField(max_length=100, unique=True, verbose_name="分类名称")
     description = models.TextField(blank=True, verbose_name="描述")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
     
     class Meta:
         verbose_name = "商品分类"
         verbose_name_plural = "商品分类"
+        # 变更流按 (created_at, id) 读取新分类
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='category_created_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -19,11 +25,12 @@ class Product(models.Model):
         ('discontinued', '停产'),
     ]
     
-    name = models.CharField(max_length=200, verbose_name="产品名称")
+    name = models.CharField(max_length=200, unique=True, verbose_name="产品名称")
     description = models.TextField(verbose_name="产品描述")
     price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="价格")
     stock_quantity = models.IntegerField(default=0, verbose_name="库存数量")
-    category = models.ForeignKey(Category, on_delete=models.CASCADE, verbose_name="分类")
+    # 外键查询由下面以 category 开头的联合索引覆盖，不再单独建索引
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, db_index=False, verbose_name="分类")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='available', verbose_name="状态")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
@@ -31,10 +38,50 @@ class Product(models.Model):
     class Meta:
         verbose_name = "产品"
         verbose_name_plural = "产品"
+        # 与 ProductAdmin 的过滤、排序方式对应
+        indexes = [
+            models.Index(fields=['category', 'status'], name='product_category_status_idx'),
+            models.Index(fields=['status', '-created_at'], name='product_status_created_idx'),
+            models.Index(fields=['-created_at'], name='product_created_idx'),
+            # API 和变更流按 (updated_at, id) 做游标分页
+            models.Index(fields=['updated_at', 'id'], name='product_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - ¥{self.price}"
 
+    def save(self, *args, **kwargs):
+        # 分类统计的信号（stats.py）在保存前锁定并读取旧值，读取和写入必须在同一事务中
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
+class CategoryStats(models.Model):
+    """每个分类的产品汇总，随产品保存、删除增量维护（见 stats.py）"""
+    category = models.OneToOneField(
+        Category, on_delete=models.CASCADE, primary_key=True, related_name='stats', verbose_name="分类",
+    )
+    product_count = models.IntegerField(default=0, verbose_name="产品数")
+    out_of_stock_count = models.IntegerField(default=0, verbose_name="缺货产品数")
+    stock_value = models.DecimalField(max_digits=20, decimal_places=2, default=0, verbose_name="库存总值")
+    price_total = models.DecimalField(max_digits=20, decimal_places=2, default=0, verbose_name="价格合计")
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="最低价格")
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="最高价格")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
+
+    class Meta:
+        verbose_name = "分类统计"
+        verbose_name_plural = "分类统计"
+
+    @property
+    def avg_price(self):
+        if not self.product_count:
+            return None
+        return (Decimal(self.price_total) / self.product_count).quantize(Decimal('0.01'))
+
+    def __str__(self):
+        return f"{self.category_id}: {self.product_count} 个产品"
+
 class Customer(models.Model):
     name = models.CharField(max_length=100, verbose_name="客户姓名")
     email = models.EmailField(unique=True, verbose_name="邮箱")
@@ -45,6 +92,27 @@ class Customer(models.Model):
     class Meta:
         verbose_name = "客户"
         verbose_name_plural = "客户"
+        # 与 CustomerAdmin 的注册时间过滤对应
+        indexes = [
+            models.Index(fields=['-date_joined'], name='customer_date_joined_idx'),
+        ]
     
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class DeletedRecord(models.Model):
+    """删除记录（墓碑），供变更流告知下游哪些记录已被删除"""
+    model = models.CharField(max_length=50, verbose_name="模型")
+    object_id = models.BigIntegerField(verbose_name="记录ID")
+    natural_key = models.CharField(max_length=254, blank=True, verbose_name="自然键")
+    deleted_at = models.DateTimeField(auto_now_add=True, verbose_name="删除时间")
+
+    class Meta:
+        verbose_name = "删除记录"
+        verbose_name_plural = "删除记录"
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='deleted_record_feed_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id}"
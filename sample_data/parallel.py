@@ -0,0 +1,213 @@
+"""
+多进程分片生成
+
+把目标行数切分为若干分片，每个分片再按批提交到进程池合成。
+随机数按固定大小的块生成（见 synth.py），结果与单进程生成完全一致。
+
+写入方式：
+- single: 子进程只负责合成，主进程作为唯一写入者（SQLite 只允许一个写入者）
+- concurrent: 子进程合成后直接写入数据库（PostgreSQL 等支持并发写入）
+
+注意：本模块在顶层不导入模型，以便子进程在 spawn 模式下先完成 django.setup()。
+"""
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.db import connection, connections
+
+WRITER_MODES = ('auto', 'single', 'concurrent')
+
+_worker_state = {}
+
+
+def split_shards(total, shards, align=1):
+    """
+    把 total 行尽量均匀地切分为 shards 个 (start, size) 区间
+
+    分片边界按 align 行对齐（传入 batch_size 时每个分片都由整批组成）。
+    """
+    units = -(-total // align)
+    shards = max(1, min(shards, units))
+    base, extra = divmod(units, shards)
+    result = []
+    start = 0
+    for index in range(shards):
+        size = min((base + (1 if index < extra else 0)) * align, total - start)
+        result.append((start, size))
+        start += size
+    return result
+
+
+def resolve_writer_mode(mode):
+    """auto 模式下 SQLite 使用单写入者，其他数据库使用并发写入"""
+    if mode not in WRITER_MODES:
+        raise ValueError(f"未知的写入模式: {mode}")
+    if mode == 'auto':
+        return 'single' if connection.vendor == 'sqlite' else 'concurrent'
+    return mode
+
+
+def _init_worker(settings_module, category_ids):
+    """子进程初始化：配置 Django 并保存分类主键"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+    # fork 出来的子进程不能复用父进程的数据库连接
+    connections.close_all()
+    _worker_state['category_ids'] = category_ids
+
+
+def _synthesize(kind, start, size, seed):
+    from . import synth
+
+    cache = _worker_state.setdefault('blocks', {})
+    if kind == 'product':
+        category_ids = _worker_state['category_ids']
+        if 'weights' not in _worker_state:
+            _worker_state['weights'] = synth.category_weights(len(category_ids))
+        return synth.generate_columns(kind, start, size, seed, cache,
+                                      category_ids=category_ids, weights=_worker_state['weights'])
+    return synth.generate_columns(kind, start, size, seed, cache)
+
+
+def _run_batch(kind, shard, start, size, seed, write, batch_size):
+    """在子进程中合成一批；write=True 时同时写入数据库"""
+    from . import synth
+    from .bulk import bulk_insert
+    from .models import Category, Product, Customer
+
+    began = time.perf_counter()
+    columns = _synthesize(kind, start, size, seed)
+    synth_elapsed = time.perf_counter() - began
+
+    if not write:
+        payload = {name: values.tolist() for name, values in columns.items()}
+        return shard, size, synth_elapsed, 0.0, payload
+
+    model = {'category': Category, 'product': Product, 'customer': Customer}[kind]
+    began = time.perf_counter()
+    result = bulk_insert(model, synth.columns_to_instances(model, columns),
+                         batch_size=batch_size, verbose=False)
+    write_elapsed = time.perf_counter() - began
+    if result.failed_batches:
+        print(f"  ✗ 分片 {shard} 第 {start} 行起的批次写入失败: {result.failed_batches[0][2]}")
+    return shard, result.inserted, synth_elapsed, write_elapsed, None
+
+
+class ShardStats:
+    """单个分片的吞吐统计"""
+
+    def __init__(self, shard, start, size):
+        self.shard = shard
+        self.start = start
+        self.size = size
+        self.rows = 0
+        self.pending = 0
+        self.synth_elapsed = 0.0
+        self.write_elapsed = 0.0
+        self.started = None
+        self.finished = None
+
+    @property
+    def wall_elapsed(self):
+        return (self.finished or time.perf_counter()) - (self.started or time.perf_counter())
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.wall_elapsed if self.wall_elapsed else 0.0
+
+
+def parallel_generate(kind, total, workers, batch_size, seed, shards=None,
+                      category_ids=None, writer_mode='auto', settings_module=None):
+    """
+    用进程池分片合成 kind（'product' 或 'customer'）的数据并写入数据库
+
+    返回写入成功的总行数。
+    """
+    from .bulk import bulk_insert
+    from .models import Category, Product, Customer
+    from . import synth
+
+    model = {'category': Category, 'product': Product, 'customer': Customer}[kind]
+    mode = resolve_writer_mode(writer_mode)
+    write_in_worker = mode == 'concurrent'
+    shards = shards or workers
+    settings_module = settings_module or os.environ['DJANGO_SETTINGS_MODULE']
+
+    stats = [ShardStats(i, start, size) for i, (start, size) in enumerate(split_shards(total, shards, batch_size))]
+    tasks = [
+        (stat.shard, batch_start, min(batch_size, stat.start + stat.size - batch_start))
+        for stat in stats
+        for batch_start in range(stat.start, stat.start + stat.size, batch_size)
+    ]
+    for shard, _, _ in tasks:
+        stats[shard].pending += 1
+
+    print(f"  {model._meta.verbose_name}: {total} 条，{len(stats)} 个分片，"
+          f"{workers} 个进程，写入模式 {mode}")
+
+    # 子进程启动前关闭连接，避免 fork 后共享同一个数据库连接
+    connections.close_all()
+
+    inserted = 0
+    began = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(settings_module, category_ids),
+    ) as executor:
+        queue = iter(tasks)
+        in_flight = set()
+        # 限制在途任务数，避免合成速度超过写入速度时结果堆积在内存中
+        max_in_flight = workers * 2
+
+        def submit_next():
+            task = next(queue, None)
+            if task is None:
+                return False
+            shard, start, size = task
+            if stats[shard].started is None:
+                stats[shard].started = time.perf_counter()
+            in_flight.add(executor.submit(
+                _run_batch, kind, shard, start, size, seed, write_in_worker, batch_size
+            ))
+            return True
+
+        while len(in_flight) < max_in_flight and submit_next():
+            pass
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                in_flight.discard(future)
+                shard, rows, synth_elapsed, write_elapsed, payload = future.result()
+
+                if payload is not None:
+                    write_began = time.perf_counter()
+                    instances = synth.columns_to_instances(model, payload)
+                    result = bulk_insert(model, instances, batch_size=batch_size, verbose=False)
+                    if result.failed_batches:
+                        print(f"  ✗ 分片 {shard} 的批次写入失败: {result.failed_batches[0][2]}")
+                    rows = result.inserted
+                    write_elapsed = time.perf_counter() - write_began
+
+                stat = stats[shard]
+                stat.rows += rows
+                stat.synth_elapsed += synth_elapsed
+                stat.write_elapsed += write_elapsed
+                stat.pending -= 1
+                inserted += rows
+                if stat.pending == 0:
+                    stat.finished = time.perf_counter()
+                    print(f"    分片 {stat.shard}: {stat.rows} 条，耗时 {stat.wall_elapsed:.2f} 秒"
+                          f"（{stat.rows_per_second:,.0f} 条/秒，合成 {stat.synth_elapsed:.2f} 秒，"
+                          f"写入 {stat.write_elapsed:.2f} 秒）")
+                submit_next()
+
+    elapsed = time.perf_counter() - began
+    rate = inserted / elapsed if elapsed else 0.0
+    print(f"  ✓ {model._meta.verbose_name}: 写入 {inserted} 条，耗时 {elapsed:.2f} 秒（{rate:,.0f} 条/秒）")
+    return inserted
+
@@ -0,0 +1,121 @@
+"""
+批量调价和批量修改状态
+
+在管理后台逐个编辑产品时，每次保存都会读出整行、触发 auto_now 并写回所有字段。
+这里直接对查询集执行集合式的 UPDATE：
+
+    UPDATE product SET price = MAX(ROUND(price * 1.1, 2), 0.01), updated_at = ?
+     WHERE <过滤条件> AND id >= ? AND id < ?
+
+按主键区间分块，每块一个事务，避免一次锁住整张表或产生过大的回滚日志。
+UPDATE 不发送信号，完成后统一使缓存失效并重建受影响分类的统计。
+"""
+
+import time
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, Max, Min, Value
+from django.db.models.functions import Greatest, Round
+from django.utils import timezone
+
+from .cache import bump_version
+from .models import Product
+from .stats import rebuild_category_stats
+
+DEFAULT_CHUNK_SIZE = 50000
+MIN_PRICE = Decimal('0.01')
+
+PRODUCT_STATUSES = [value for value, _ in Product.STATUS_CHOICES]
+
+
+class BulkUpdateResult:
+    """一次批量更新的统计结果"""
+
+    def __init__(self, label):
+        self.label = label
+        self.updated = 0
+        self.chunks = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.updated / self.elapsed if self.elapsed else 0.0
+
+
+def price_expression(percent=None, amount=None):
+    """按百分比和/或固定金额调整后的价格表达式，结果保留两位小数且不低于 0.01"""
+    if percent is None and amount is None:
+        raise ValueError("必须指定调价百分比或金额")
+    price_field = Product._meta.get_field('price')
+    money = DecimalField(max_digits=price_field.max_digits, decimal_places=price_field.decimal_places)
+    expression = F('price')
+    if percent is not None:
+        if percent <= -100:
+            raise ValueError(f"调价百分比必须大于 -100: {percent}")
+        expression = expression * Value(1 + Decimal(str(percent)) / 100, output_field=money)
+    if amount is not None:
+        expression = expression + Value(Decimal(str(amount)), output_field=money)
+    return Greatest(Round(expression, 2, output_field=money), Value(MIN_PRICE, output_field=money),
+                    output_field=money)
+
+
+def chunked_update(queryset, values, chunk_size=DEFAULT_CHUNK_SIZE, verbose=True):
+    """
+    按主键区间分块对 queryset 执行 UPDATE，返回 BulkUpdateResult
+
+    values 为传给 QuerySet.update() 的字段和值（或表达式），会自动加上 updated_at。
+    """
+    model = queryset.model
+    result = BulkUpdateResult(model._meta.verbose_name)
+    start = time.perf_counter()
+    queryset = queryset.order_by()
+    bounds = queryset.aggregate(low=Min('pk'), high=Max('pk'))
+
+    if bounds['low'] is not None:
+        values = {**values, 'updated_at': timezone.now()}
+        for chunk_start in range(bounds['low'], bounds['high'] + 1, chunk_size):
+            with transaction.atomic(using=queryset.db):
+                result.updated += queryset.filter(
+                    pk__gte=chunk_start, pk__lt=chunk_start + chunk_size,
+                ).update(**values)
+            result.chunks += 1
+
+    result.elapsed = time.perf_counter() - start
+    if verbose:
+        print(f"  ✓ {result.label}: 更新 {result.updated} 条，共 {result.chunks} 块，"
+              f"耗时 {result.elapsed:.2f} 秒（{result.rows_per_second:,.0f} 条/秒）")
+    return result
+
+
+def _affected_categories(queryset):
+    return list(queryset.order_by().values_list('category_id', flat=True).distinct())
+
+
+def _finish(queryset, category_ids, verbose):
+    bump_version(Product, using=queryset.db)
+    rebuild_category_stats(category_ids, using=queryset.db, verbose=verbose)
+
+
+def reprice(queryset, percent=None, amount=None, chunk_size=DEFAULT_CHUNK_SIZE, verbose=True):
+    """
+    调整 queryset 中产品的价格
+
+    percent=10 表示涨价 10%，amount=-5 表示每件降价 5 元，两者可以同时指定（先按百分比再加金额）。
+    """
+    expression = price_expression(percent, amount)
+    category_ids = _affected_categories(queryset)
+    result = chunked_update(queryset, {'price': expression}, chunk_size, verbose)
+    _finish(queryset, category_ids, verbose)
+    return result
+
+
+def set_status(queryset, status, chunk_size=DEFAULT_CHUNK_SIZE, verbose=True):
+    """把 queryset 中产品的状态改为 status（已经是该状态的产品不会被更新）"""
+    if status not in PRODUCT_STATUSES:
+        raise ValueError(f"未知的产品状态: {status}")
+    queryset = queryset.exclude(status=status)
+    category_ids = _affected_categories(queryset)
+    result = chunked_update(queryset, {'status': status}, chunk_size, verbose)
+    _finish(queryset, category_ids, verbose)
+    return result
@@ -0,0 +1,103 @@
+"""
+快速清空样本数据表
+
+``Model.objects.all().delete()`` 会先取出所有主键来模拟级联删除和信号，
+大表上既慢又占内存。这里直接使用数据库自身的清表语句：
+
+- PostgreSQL: TRUNCATE ... RESTART IDENTITY CASCADE
+- SQLite: DELETE FROM ... 并重置 sqlite_sequence，全部在一个事务中完成
+
+清表语句失败时退回到按主键区间分块的 ``_raw_delete``（不取主键、不发信号）。
+"""
+
+import time
+
+from django.core.management.color import no_style
+from django.db import DatabaseError, connections, transaction
+
+from .cache import bump_version
+from .models import Category, CategoryStats, Product, Customer
+from .search import triggers_suspended
+
+RESET_MODES = ('fast', 'orm')
+
+# 先删除子表再删除父表
+SAMPLE_MODELS = [Product, Customer, CategoryStats, Category]
+
+DEFAULT_CHUNK_SIZE = 50000
+
+
+def _flush_tables(models, using):
+    """在一个事务中逐表执行 sql_flush，返回每张表的耗时"""
+    connection = connections[using]
+    tables = [model._meta.db_table for model in models]
+    timings = []
+    with transaction.atomic(using=using), triggers_suspended(connection, tables):
+        with connection.cursor() as cursor:
+            for model in models:
+                table = model._meta.db_table
+                statements = connection.ops.sql_flush(
+                    no_style(), [table], reset_sequences=True, allow_cascade=True,
+                )
+                start = time.perf_counter()
+                for sql in statements:
+                    cursor.execute(sql)
+                timings.append((model, time.perf_counter() - start))
+    return timings
+
+
+def _raw_delete_chunked(models, using, chunk_size):
+    """按主键区间分块删除，每块一个事务"""
+    timings = []
+    for model in models:
+        start = time.perf_counter()
+        manager = model._base_manager.using(using)
+        bounds = manager.order_by().values_list('pk', flat=True)
+        low = bounds.order_by('pk').first()
+        high = bounds.order_by('-pk').first()
+        if low is not None:
+            for chunk_start in range(low, high + 1, chunk_size):
+                with transaction.atomic(using=using):
+                    manager.filter(
+                        pk__gte=chunk_start, pk__lt=chunk_start + chunk_size,
+                    )._raw_delete(using)
+        timings.append((model, time.perf_counter() - start))
+    return timings
+
+
+def _orm_delete(models, using):
+    """原有的 ORM 删除方式（会触发级联和信号）"""
+    timings = []
+    for model in models:
+        start = time.perf_counter()
+        model._base_manager.using(using).all().delete()
+        timings.append((model, time.perf_counter() - start))
+    return timings
+
+
+def reset_tables(models=None, mode='fast', using='default', chunk_size=DEFAULT_CHUNK_SIZE,
+                 verbose=True):
+    """
+    清空 models 对应的数据表，返回 [(model, 耗时秒数), ...]
+
+    mode='fast' 使用清表语句（失败时退回分块删除），mode='orm' 使用 ORM 删除。
+    """
+    if mode not in RESET_MODES:
+        raise ValueError(f"未知的清理模式: {mode}")
+    models = models or SAMPLE_MODELS
+
+    if mode == 'orm':
+        timings = _orm_delete(models, using)
+    else:
+        try:
+            timings = _flush_tables(models, using)
+        except DatabaseError as e:
+            if verbose:
+                print(f"  清表语句执行失败（{e}），改为分块删除")
+            timings = _raw_delete_chunked(models, using, chunk_size)
+    bump_version(*models, using=using)
+
+    if verbose:
+        for model, elapsed in timings:
+            print(f"  ✓ {model._meta.verbose_name} ({model._meta.db_table}): {elapsed:.3f} 秒")
+    return timings
@@ -0,0 +1,181 @@
+"""
+产品和客户的全文搜索
+
+管理后台默认的搜索会编译成 ``LIKE '%词%'``，每次都要扫描整张表。这里按数据库选择索引：
+
+- PostgreSQL: pg_trgm 扩展 + GIN 三元组索引，建在 ``UPPER(列::text)`` 上，
+  与 Django 为 icontains 生成的表达式一致，普通的 icontains 查询即可走索引
+- SQLite: FTS5 外部内容虚拟表（``<表名>_fts``），使用 trigram 分词器，
+  由触发器与原表保持同步
+
+两种方式都以字符三元组为单位建索引，不依赖空格分词，中文名称和描述同样适用。
+三元组索引无法匹配少于 3 个字符的词（例如“手机”），这些词仍退回到 icontains，
+并与其他可走索引的词取交集。
+
+索引由迁移 0004 建立，迁移中的 SQL 是当时这里生成的语句的副本：修改这里的语句后，
+需要新增一个迁移写入新的 SQL，而不是修改 0004。
+
+注意：SQLite 上重建这些表的迁移（AlterField 等）会连同触发器一起删除，
+这类迁移之后需要再次建立（新的迁移中调用 RunSQL，或者调用 install()）。
+"""
+
+from contextlib import contextmanager
+
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.text import smart_split, unescape_string_literal
+
+# 表名 -> 建立搜索索引的列
+SEARCH_COLUMNS = {
+    'sample_data_product': ['name', 'description'],
+    'sample_data_customer': ['name', 'email'],
+}
+
+MIN_INDEXED_LENGTH = 3
+
+
+def fts_table(table):
+    return f"{table}_fts"
+
+
+def _sqlite_trigger_statements(table, columns):
+    fts = fts_table(table)
+    cols = ', '.join(columns)
+    new_values = ', '.join(f'new.{c}' for c in columns)
+    old_values = ', '.join(f'old.{c}' for c in columns)
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values});"
+    insert_new = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def _sqlite_drop_trigger_statements(table):
+    fts = fts_table(table)
+    return [f"DROP TRIGGER IF EXISTS {fts}_{suffix}" for suffix in ('ai', 'ad', 'au')]
+
+
+def _sqlite_install_statements(table, columns):
+    fts = fts_table(table)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{', '.join(columns)}, content='{table}', content_rowid='id', tokenize='trigram')",
+        *_sqlite_trigger_statements(table, columns),
+        # 为已有数据建立索引
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def _postgres_install_statements(table, columns):
+    statements = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"]
+    for column in columns:
+        statements.append(
+            f'CREATE INDEX IF NOT EXISTS {table}_{column}_trgm ON "{table}" '
+            f'USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+        )
+    return statements
+
+
+def install(connection):
+    """为所有搜索表建立全文索引（语句与迁移 0004 相同）"""
+    with connection.cursor() as cursor:
+        for table, columns in SEARCH_COLUMNS.items():
+            if connection.vendor == 'sqlite':
+                statements = _sqlite_install_statements(table, columns)
+            elif connection.vendor == 'postgresql':
+                statements = _postgres_install_statements(table, columns)
+            else:
+                return
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def uninstall(connection):
+    """删除全文索引"""
+    with connection.cursor() as cursor:
+        for table, columns in SEARCH_COLUMNS.items():
+            if connection.vendor == 'sqlite':
+                statements = _sqlite_drop_trigger_statements(table)
+                statements.append(f"DROP TABLE IF EXISTS {fts_table(table)}")
+            elif connection.vendor == 'postgresql':
+                statements = [f'DROP INDEX IF EXISTS {table}_{column}_trgm' for column in columns]
+            else:
+                return
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def has_fts(connection, table):
+    """SQLite 上是否存在 table 对应的 FTS5 表"""
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [fts_table(table)])
+        return cursor.fetchone() is not None
+
+
+@contextmanager
+def triggers_suspended(connection, tables):
+    """
+    暂时移除 SQLite 同步触发器，用于整表清空等批量操作
+
+    否则 DELETE FROM 会为每一行执行一次触发器，并且无法使用 SQLite 的整表截断优化。
+    退出时恢复触发器，并按原表当前内容重建全文索引。
+    """
+    tables = [t for t in tables if t in SEARCH_COLUMNS and has_fts(connection, t)]
+    with connection.cursor() as cursor:
+        for table in tables:
+            for sql in _sqlite_drop_trigger_statements(table):
+                cursor.execute(sql)
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for table in tables:
+                for sql in _sqlite_trigger_statements(table, SEARCH_COLUMNS[table]):
+                    cursor.execute(sql)
+                fts = fts_table(table)
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def split_terms(search_term):
+    """与管理后台一致地拆分搜索词：按空白拆分，支持引号括起的短语"""
+    terms = []
+    for bit in smart_split(search_term):
+        if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+            bit = unescape_string_literal(bit)
+        if bit:
+            terms.append(bit)
+    return terms
+
+
+def search(queryset, search_term):
+    """
+    在 queryset 中搜索 search_term：每个词需出现在任一搜索列中，多个词之间为“且”
+    """
+    from django.db import connections
+
+    table = queryset.model._meta.db_table
+    columns = SEARCH_COLUMNS[table]
+    connection = connections[queryset.db]
+    terms = split_terms(search_term)
+
+    if has_fts(connection, table):
+        indexed = [t for t in terms if len(t) >= MIN_INDEXED_LENGTH]
+        terms = [t for t in terms if len(t) < MIN_INDEXED_LENGTH]
+        if indexed:
+            fts = fts_table(table)
+            match = ' AND '.join('"%s"' % t.replace('"', '""') for t in indexed)
+            queryset = queryset.filter(
+                pk__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [match])
+            )
+
+    for term in terms:
+        condition = Q()
+        for column in columns:
+            condition |= Q(**{f'{column}__icontains': term})
+        queryset = queryset.filter(condition)
+    return queryset
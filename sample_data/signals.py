@@ -0,0 +1,39 @@
+"""
+模型信号处理
+
+在 apps.SampleDataConfig.ready() 中连接：保存和删除时使缓存失效，删除时写入墓碑
+（见 changefeed.py），产品变化时增量维护分类统计（见 stats.py）。批量写入（bulk_create、update、清表语句）不会发送这些信号，
+相应的代码路径会直接调用 cache.bump_version()。
+
+另外在每个新的数据库连接上执行 SQLite PRAGMA（见 sqlite.py），并装上查询统计（见 middleware.py）。
+"""
+
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from . import cache, stats
+from .changefeed import record_deletion
+from .middleware import install_recorder
+from .sqlite import apply_pragmas
+
+
+def invalidate_cache(sender, using=None, **kwargs):
+    """记录保存或删除后，使该模型相关的缓存失效（在事务提交之后，见 cache.bump_version()）"""
+    cache.bump_version(sender, using=using)
+
+
+def connect_signals():
+    from .models import Category, Product, Customer
+
+    connection_created.connect(apply_pragmas, dispatch_uid='sample_data_sqlite_pragmas')
+    connection_created.connect(install_recorder, dispatch_uid='sample_data_query_recorder')
+
+    for model in (Category, Product, Customer):
+        uid = f'sample_data_{model._meta.model_name}'
+        post_save.connect(invalidate_cache, sender=model, dispatch_uid=f'{uid}_cache_save')
+        post_delete.connect(invalidate_cache, sender=model, dispatch_uid=f'{uid}_cache_delete')
+        post_delete.connect(record_deletion, sender=model, dispatch_uid=f'{uid}_tombstone')
+
+    pre_save.connect(stats.product_pre_save, sender=Product, dispatch_uid='sample_data_product_stats_pre_save')
+    post_save.connect(stats.product_post_save, sender=Product, dispatch_uid='sample_data_product_stats_save')
+    post_delete.connect(stats.product_post_delete, sender=Product, dispatch_uid='sample_data_product_stats_delete')
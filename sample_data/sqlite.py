@@ -0,0 +1,92 @@
+"""
+SQLite 连接调优
+
+默认的 SQLite 配置面向单个写入者：回滚日志模式下写事务会阻塞所有读取，每次提交都要 fsync，
+并发的管理后台写入很容易遇到 "database is locked"。这里在每个新连接建立时
+（connection_created 信号）执行一组 PRAGMA，由 settings.SQLITE_PROFILE 选择：
+
+- tuned（默认）: WAL 日志模式（读写互不阻塞）、synchronous=NORMAL（WAL 下只在检查点 fsync，
+  断电最多丢失最近提交的事务，不会损坏数据库）、64 MB 页缓存、256 MB 内存映射、
+  临时表放在内存中
+- default: SQLite 自身的默认值（回滚日志、synchronous=FULL），用于对比或回退；
+  WAL 模式会保存在数据库文件中，切换回来时需要显式设置
+- off: 不执行任何 PRAGMA
+
+settings.SQLITE_PRAGMAS 可以在所选配置的基础上覆盖或追加单个 PRAGMA。
+写事务的加锁方式（transaction_mode=IMMEDIATE）和锁等待时间（timeout，默认 20 秒）是连接参数，
+在 settings.DATABASES 的 OPTIONS 中配置，见 database_options()。锁等待时间只由 timeout 决定，
+配置中不再设置 busy_timeout PRAGMA（连接建立后执行的 PRAGMA 会覆盖 timeout）。
+"""
+
+from django.conf import settings
+
+DEFAULT_PROFILE = 'tuned'
+DEFAULT_TIMEOUT = 20   # 秒
+
+PROFILES = {
+    'tuned': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,       # 负数表示 KB
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+    },
+    'default': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'cache_size': -2000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+    },
+    'off': {},
+}
+
+
+def get_profile():
+    profile = getattr(settings, 'SQLITE_PROFILE', DEFAULT_PROFILE) or 'off'
+    if profile not in PROFILES:
+        raise ValueError(f"未知的 SQLite 配置: {profile}（可选: {', '.join(PROFILES)}）")
+    return profile
+
+
+def get_pragmas(profile=None):
+    """所选配置的 PRAGMA，合并 settings.SQLITE_PRAGMAS 中的覆盖项"""
+    pragmas = dict(PROFILES[profile or get_profile()])
+    pragmas.update(getattr(settings, 'SQLITE_PRAGMAS', {}))
+    return pragmas
+
+
+def database_options(profile=DEFAULT_PROFILE, timeout=DEFAULT_TIMEOUT):
+    """
+    settings.DATABASES 中 SQLite 的 OPTIONS
+
+    tuned 配置下写事务使用 BEGIN IMMEDIATE：事务开始时就取得写锁，
+    而不是先读后写时再升级（升级失败会直接报 "database is locked"，不会等待 busy_timeout）。
+    """
+    if profile != 'tuned':
+        return {}
+    return {'timeout': timeout, 'transaction_mode': 'IMMEDIATE'}
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """connection_created 信号处理：对新的 SQLite 连接执行 PRAGMA"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = get_pragmas()
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def current_pragmas(connection, names=None):
+    """读取连接当前的 PRAGMA 值，用于检查配置是否生效"""
+    names = names or [*PROFILES[DEFAULT_PROFILE], 'busy_timeout']
+    values = {}
+    with connection.cursor() as cursor:
+        for name in names:
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            values[name] = row[0] if row else None
+    return values
@@ -0,0 +1,190 @@
+"""
+分类统计（CategoryStats）
+
+“每个分类有多少产品、库存总值多少、价格区间”原本每次都要对整张产品表 GROUP BY。
+这里把结果存进 CategoryStats，看板只需读取与分类数量相同的行：
+
+- 通过 save() / delete() 修改单个产品时，由信号增量维护：先减去旧值的贡献再加上新值，
+  全部用 F() 表达式在数据库中累加，并发修改不会互相覆盖。保存时旧值用 SELECT ... FOR UPDATE
+  读取（Product.save() 把整个保存放在一个事务中），并发保存同一产品时后一个等待前一个提交，
+  不会基于同一个旧值重复计算增量
+- 最低价 / 最高价在新增时用 CASE 比较更新；删除或降价的正好是当前最低 / 最高价时，
+  只对该分类重新计算一次 MIN / MAX
+- 库存预留（stock.py）不更新统计：同一分类的所有产品共用一行统计，在预留的事务中更新它会让
+  这些产品的预留互相等待。库存总值和缺货数因此会落后于预留，由 rebuild_category_stats()
+  定期重新计算（``python manage.py rebuild_stats``）
+- 批量写入（bulk_create、update、清表）不发送信号，之后调用 rebuild_category_stats()
+  用一条 GROUP BY 整体重建。重建在一个事务中先锁定统计行再聚合：增量更新要等重建提交后才能执行，
+  之前已经提交的增量都包含在聚合结果中，不会被旧的快照覆盖
+"""
+
+import time
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DecimalField, F, Max, Min, Q, Sum, Value, When
+from django.utils import timezone
+
+from .cache import bump_version
+from .models import Category, CategoryStats, Product
+
+_TRACKED_FIELDS = ['category_id', 'price', 'stock_quantity', 'status']
+_STATS_FIELDS = ['product_count', 'out_of_stock_count', 'stock_value', 'price_total',
+                 'min_price', 'max_price', 'updated_at']
+_price_field = Product._meta.get_field('price')
+
+
+def _values(instance):
+    return (
+        instance.category_id,
+        _price_field.to_python(instance.price),
+        instance.stock_quantity,
+        instance.status,
+    )
+
+
+def _apply(category_id, deltas, new_price=None, using='default'):
+    """把 deltas（字段 -> 增量）累加到分类统计上，返回受影响行数"""
+    updates = {field: F(field) + value for field, value in deltas.items() if value}
+    if new_price is not None:
+        updates['min_price'] = Case(
+            When(Q(min_price__isnull=True) | Q(min_price__gt=new_price), then=Value(new_price)),
+            default=F('min_price'),
+        )
+        updates['max_price'] = Case(
+            When(Q(max_price__isnull=True) | Q(max_price__lt=new_price), then=Value(new_price)),
+            default=F('max_price'),
+        )
+    if not updates:
+        return 1
+    updates['updated_at'] = timezone.now()
+    return CategoryStats.objects.using(using).filter(pk=category_id).update(**updates)
+
+
+def _refresh_price_range(category_id, using='default'):
+    prices = Product.objects.using(using).filter(category_id=category_id).aggregate(
+        low=Min('price'), high=Max('price'),
+    )
+    CategoryStats.objects.using(using).filter(pk=category_id).update(
+        min_price=prices['low'], max_price=prices['high'], updated_at=timezone.now(),
+    )
+
+
+def product_added(category_id, price, stock_quantity, status, using='default'):
+    deltas = {
+        'product_count': 1,
+        'out_of_stock_count': 1 if status == 'out_of_stock' else 0,
+        'stock_value': price * stock_quantity,
+        'price_total': price,
+    }
+    if _apply(category_id, deltas, new_price=price, using=using):
+        return
+    # 该分类还没有统计行
+    try:
+        with transaction.atomic(using=using):
+            CategoryStats.objects.using(using).get_or_create(category_id=category_id)
+    except IntegrityError:
+        # 分类已被删除
+        return
+    _apply(category_id, deltas, new_price=price, using=using)
+
+
+def product_removed(category_id, price, stock_quantity, status, using='default'):
+    deltas = {
+        'product_count': -1,
+        'out_of_stock_count': -1 if status == 'out_of_stock' else 0,
+        'stock_value': -(price * stock_quantity),
+        'price_total': -price,
+    }
+    if not _apply(category_id, deltas, using=using):
+        return
+    if CategoryStats.objects.using(using).filter(
+        Q(min_price=price) | Q(max_price=price), pk=category_id,
+    ).exists():
+        _refresh_price_range(category_id, using=using)
+
+
+def product_pre_save(sender, instance, raw=False, using='default', **kwargs):
+    """保存前锁定产品行并记下数据库中的旧值（在 Product.save() 的事务中执行）"""
+    previous = None
+    if instance.pk is not None and not instance._state.adding:
+        previous = Product.objects.using(using).select_for_update().filter(pk=instance.pk).values_list(
+            *_TRACKED_FIELDS,
+        ).first()
+    instance._category_stats_previous = previous
+
+
+def product_post_save(sender, instance, created=False, using='default', **kwargs):
+    previous = instance.__dict__.pop('_category_stats_previous', None)
+    current = _values(instance)
+    if previous is not None:
+        previous = (previous[0], _price_field.to_python(previous[1]), previous[2], previous[3])
+        if previous == current:
+            return
+        product_removed(*previous, using=using)
+    product_added(*current, using=using)
+    bump_version(CategoryStats, using=using)
+
+
+def product_post_delete(sender, instance, using='default', **kwargs):
+    product_removed(*_values(instance), using=using)
+    bump_version(CategoryStats, using=using)
+
+
+def rebuild_category_stats(category_ids=None, using='default', verbose=True):
+    """
+    用一次 GROUP BY 重建分类统计，category_ids 为 None 时重建全部分类
+
+    返回重建的分类数。
+    """
+    start = time.perf_counter()
+    categories = Category.objects.using(using)
+    products = Product.objects.using(using)
+    existing = CategoryStats.objects.using(using)
+    if category_ids is not None:
+        category_ids = list(category_ids)
+        categories = categories.filter(pk__in=category_ids)
+        products = products.filter(category_id__in=category_ids)
+        existing = existing.filter(pk__in=category_ids)
+
+    money = DecimalField(max_digits=20, decimal_places=2)
+    now = timezone.now()
+    with transaction.atomic(using=using):
+        # 先锁定统计行，再在同一事务中聚合（见模块说明）；统计行原地更新，等待中的增量更新不会落空
+        locked = set(existing.select_for_update().values_list('pk', flat=True))
+        aggregates = {
+            row['category_id']: row
+            for row in products.order_by().values('category_id').annotate(
+                product_count=Count('id'),
+                out_of_stock_count=Count('id', filter=Q(status='out_of_stock')),
+                stock_value=Sum(F('price') * F('stock_quantity'), output_field=money),
+                price_total=Sum('price', output_field=money),
+                min_price=Min('price'),
+                max_price=Max('price'),
+            )
+        }
+
+        stats = []
+        for category_id in categories.values_list('pk', flat=True):
+            row = aggregates.get(category_id, {})
+            stats.append(CategoryStats(
+                category_id=category_id,
+                product_count=row.get('product_count', 0),
+                out_of_stock_count=row.get('out_of_stock_count', 0),
+                stock_value=row.get('stock_value') or 0,
+                price_total=row.get('price_total') or 0,
+                min_price=row.get('min_price'),
+                max_price=row.get('max_price'),
+                updated_at=now,
+            ))
+
+        CategoryStats.objects.using(using).bulk_update(
+            [obj for obj in stats if obj.pk in locked], _STATS_FIELDS, batch_size=1000,
+        )
+        CategoryStats.objects.using(using).bulk_create(
+            [obj for obj in stats if obj.pk not in locked], batch_size=1000,
+        )
+    bump_version(CategoryStats, using=using)
+
+    if verbose:
+        print(f"  ✓ 分类统计: 重建 {len(stats)} 个分类，耗时 {time.perf_counter() - start:.2f} 秒")
+    return len(stats)
@@ -0,0 +1,130 @@
+"""
+库存预留
+
+管理后台里修改库存是“读出来、改、再保存”，并发下单时会超卖或丢失更新。
+这里每次预留都是一条带条件的 UPDATE，由数据库保证原子性，不需要先读取、也不加锁：
+
+    UPDATE product
+       SET stock_quantity = stock_quantity - n,
+           status = CASE WHEN stock_quantity = n THEN 'out_of_stock' ELSE status END
+     WHERE id = ? AND status = 'available' AND stock_quantity >= n
+
+受影响行数为 0 即表示库存不足（或产品不可售）。库存减到 0 时在同一条语句中把状态改为缺货。
+多件商品的订单用一条 UPDATE（CASE 按产品给出数量）一次完成，行数不等于商品数时整体回滚。
+
+QuerySet.update() 不发送信号、不触发 auto_now，这里显式写入 updated_at（变更流依赖它），
+并使产品缓存失效。分类统计（stats.py）的库存总值和缺货数不在预留时更新：同一分类共用一行统计，
+在这里更新它会让同一分类不同产品的预留互相等待；这两项由 rebuild_category_stats() 定期重新计算。
+"""
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from .cache import bump_version
+from .models import Product
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _check_quantity(quantity):
+    if not isinstance(quantity, int) or quantity <= 0:
+        raise ValueError(f"数量必须是正整数: {quantity!r}")
+
+
+def _merge_items(items):
+    """把 {产品id: 数量} 或 [(产品id, 数量), ...] 合并为字典，同一产品的数量相加"""
+    if isinstance(items, dict):
+        items = items.items()
+    merged = {}
+    for product_id, quantity in items:
+        _check_quantity(quantity)
+        merged[product_id] = merged.get(product_id, 0) + quantity
+    return merged
+
+
+def reserve(product_id, quantity=1, using='default'):
+    """预留一个产品的库存，成功返回 True，库存不足或不可售返回 False"""
+    _check_quantity(quantity)
+    updated = Product.objects.using(using).filter(
+        pk=product_id, status='available', stock_quantity__gte=quantity,
+    ).update(
+        stock_quantity=F('stock_quantity') - quantity,
+        status=Case(
+            When(stock_quantity=quantity, then=Value('out_of_stock')),
+            default=F('status'),
+        ),
+        updated_at=timezone.now(),
+    )
+    if updated:
+        bump_version(Product, using=using)
+    return bool(updated)
+
+
+def reserve_many(items, using='default'):
+    """
+    一次预留多个产品的库存（全部成功或全部不变）
+
+    items 为 {产品id: 数量} 或 [(产品id, 数量), ...]。
+    成功返回空列表，否则返回库存不足或不可售的产品 id 列表。
+    """
+    items = _merge_items(items)
+    if not items:
+        return []
+
+    wanted = Case(
+        *[When(pk=product_id, then=Value(quantity)) for product_id, quantity in items.items()],
+        output_field=IntegerField(),
+    )
+    try:
+        with transaction.atomic(using=using):
+            updated = Product.objects.using(using).filter(
+                pk__in=list(items), status='available', stock_quantity__gte=wanted,
+            ).update(
+                stock_quantity=F('stock_quantity') - wanted,
+                status=Case(
+                    When(stock_quantity=wanted, then=Value('out_of_stock')),
+                    default=F('status'),
+                ),
+                updated_at=timezone.now(),
+            )
+            if updated != len(items):
+                raise _Rollback()
+    except _Rollback:
+        # 并发的归还可能让库存在回滚后又变得足够，此时仍按失败处理
+        return shortages(items, using=using) or list(items)
+
+    bump_version(Product, using=using)
+    return []
+
+
+def shortages(items, using='default'):
+    """返回 items 中当前库存不足或不可售的产品 id（只在预留失败时调用）"""
+    items = _merge_items(items)
+    available = dict(
+        Product.objects.using(using)
+        .filter(pk__in=list(items), status='available')
+        .values_list('pk', 'stock_quantity')
+    )
+    return [
+        product_id for product_id, quantity in items.items()
+        if available.get(product_id, 0) < quantity
+    ]
+
+
+def release(product_id, quantity=1, using='default'):
+    """归还库存（取消订单），缺货的产品恢复为可用；停产的产品状态不变"""
+    _check_quantity(quantity)
+    updated = Product.objects.using(using).filter(pk=product_id).update(
+        stock_quantity=F('stock_quantity') + quantity,
+        status=Case(
+            When(status='out_of_stock', then=Value('available')),
+            default=F('status'),
+        ),
+        updated_at=timezone.now(),
+    )
+    if updated:
+        bump_version(Product, using=using)
+    return bool(updated)
@@ -0,0 +1,235 @@
+"""
+大规模合成数据生成
+
+按列（NumPy 数组）一次生成一整批字段，再组装成模型实例交给批量写入，
+内存中只保留当前一批。数据按固定大小的块（BLOCK_SIZE 行）生成，每一块的随机数种子
+由 (seed, 模型, 块的起始行号) 决定，批次从块中截取，因此同一个 seed 无论 batch_size
+是多少、怎样切分分片，生成的数据都完全一致。
+"""
+
+from itertools import chain
+
+import numpy as np
+
+from .models import Category, Product, Customer
+
+DEFAULT_SEED = 20240101
+
+# 随机数按块生成，块大小固定，不随 batch_size 变化
+BLOCK_SIZE = 10000
+
+BASE_CATEGORIES = np.array([
+    "电子产品", "家用电器", "服装鞋帽", "食品饮料", "图书文具", "运动户外", "美妆个护",
+])
+CATEGORY_DESCRIPTIONS = np.array([
+    "手机、电脑、平板等电子设备",
+    "冰箱、洗衣机、空调等家用电器",
+    "男女服装、鞋子、配饰",
+    "零食、饮料、生鲜食品",
+    "书籍、文具、办公用品",
+    "运动器材、户外装备",
+    "化妆品、护肤品、个人护理",
+])
+
+BRANDS = np.array([
+    "华为", "小米", "联想", "海尔", "美的", "格力", "李宁", "安踏", "波司登", "良品铺子",
+    "三只松鼠", "晨光", "得力", "百雀羚", "自然堂", "苹果", "三星", "索尼", "耐克", "阿迪达斯",
+])
+PRODUCT_NOUNS = np.array([
+    "智能手机", "笔记本电脑", "平板电脑", "无线耳机", "智能手表", "冰箱", "洗衣机", "空调",
+    "电饭煲", "牛仔裤", "连衣裙", "运动鞋", "羽绒服", "咖啡豆", "巧克力", "坚果礼盒",
+    "钢笔", "笔记本", "瑜伽垫", "登山杖", "帐篷", "面霜", "洗发水", "防晒霜",
+])
+PRODUCT_ADJECTIVES = np.array([
+    "轻薄便携", "性能强大", "节能环保", "静音设计", "舒适耐穿", "时尚百搭", "香气浓郁",
+    "口感丝滑", "防水耐用", "深层保湿", "温和无刺激", "高性价比",
+])
+SERIES = np.array(list("ASXPMGTZ"))
+
+SURNAMES = np.array([
+    "王", "李", "张", "刘", "陈", "杨", "黄", "赵", "吴", "周",
+    "徐", "孙", "马", "朱", "胡", "郭", "何", "高", "林", "罗",
+])
+SURNAME_PINYIN = np.array([
+    "wang", "li", "zhang", "liu", "chen", "yang", "huang", "zhao", "wu", "zhou",
+    "xu", "sun", "ma", "zhu", "hu", "guo", "he", "gao", "lin", "luo",
+])
+GIVEN_CHARS = np.array(list("伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华建国志文海燕红玉兰"))
+
+CITIES = np.array(["北京市", "上海市", "广州市", "深圳市", "杭州市", "成都市", "武汉市", "南京市", "西安市", "重庆市"])
+DISTRICTS = np.array(["朝阳区", "浦东新区", "天河区", "南山区", "西湖区", "武侯区", "武昌区", "鼓楼区", "雁塔区", "渝中区"])
+ROADS = np.array(["建国路", "陆家嘴路", "体育西路", "科技园路", "文三路", "人民南路", "中南路", "中山路", "长安街", "解放路"])
+PHONE_PREFIXES = np.array(["13", "15", "17", "18", "19"])
+
+_MODEL_CODES = {'category': 1, 'product': 2, 'customer': 3}
+
+
+def block_rng(seed, kind, block):
+    """返回第 block 块专用的随机数生成器"""
+    return np.random.default_rng([seed, _MODEL_CODES[kind], block * BLOCK_SIZE])
+
+
+def _join(*parts):
+    """逐元素拼接字符串数组"""
+    result = parts[0].astype(str)
+    for part in parts[1:]:
+        result = np.char.add(result, np.asarray(part).astype(str))
+    return result
+
+
+def category_columns(start, size, rng):
+    """生成 [start, start + size) 行的分类字段"""
+    index = np.arange(start, start + size)
+    base = index % len(BASE_CATEGORIES)
+    names = BASE_CATEGORIES[base]
+    # 前 7 个保留原始分类名，其后追加序号保证唯一
+    numbered = index >= len(BASE_CATEGORIES)
+    names = np.where(numbered, _join(names, "-", index // len(BASE_CATEGORIES)), names)
+    return {
+        'name': names,
+        'description': CATEGORY_DESCRIPTIONS[base],
+    }
+
+
+def category_weights(count):
+    """类 Zipf 分布的分类权重：少数热门分类拥有大部分产品"""
+    weights = 1.0 / np.arange(1, count + 1) ** 0.8
+    return weights / weights.sum()
+
+
+def product_columns(start, size, rng, category_ids, weights=None):
+    """生成 [start, start + size) 行的产品字段，category_ids 为可分配的分类主键数组"""
+    index = np.arange(start, start + size)
+    brand = rng.integers(0, len(BRANDS), size)
+    noun = rng.integers(0, len(PRODUCT_NOUNS), size)
+    adjective = rng.integers(0, len(PRODUCT_ADJECTIVES), size)
+    series = rng.integers(0, len(SERIES), size)
+
+    # 行号作为型号的一部分，保证产品名唯一
+    names = _join(BRANDS[brand], " ", PRODUCT_NOUNS[noun], " ", SERIES[series], index)
+    descriptions = _join(PRODUCT_ADJECTIVES[adjective], "，", BRANDS[brand], "出品的", PRODUCT_NOUNS[noun])
+
+    # 价格服从对数正态分布（大多数几十到几百元，少量上万元），以分为单位取整
+    cents = np.clip(np.rint(rng.lognormal(mean=5.5, sigma=1.1, size=size) * 100), 100, 99_999_999)
+    cents = cents.astype(np.int64)
+    prices = _join(cents // 100, ".", np.char.zfill((cents % 100).astype(str), 2))
+
+    # 库存服从负二项分布：均值约 50，约 2% 为 0
+    stock = rng.negative_binomial(n=1, p=0.02, size=size)
+    status = np.where(stock == 0, 'out_of_stock', 'available')
+    status = np.where(rng.random(size) < 0.02, 'discontinued', status)
+
+    if weights is None:
+        weights = category_weights(len(category_ids))
+    categories = rng.choice(category_ids, size=size, p=weights)
+
+    return {
+        'name': names,
+        'description': descriptions,
+        'price': prices,
+        'stock_quantity': stock,
+        'status': status,
+        'category_id': categories,
+    }
+
+
+def customer_columns(start, size, rng):
+    """生成 [start, start + size) 行的客户字段"""
+    index = np.arange(start, start + size)
+    surname = rng.integers(0, len(SURNAMES), size)
+    given_first = GIVEN_CHARS[rng.integers(0, len(GIVEN_CHARS), size)]
+    given_second = GIVEN_CHARS[rng.integers(0, len(GIVEN_CHARS), size)]
+    single = rng.random(size) < 0.3
+    names = _join(SURNAMES[surname], given_first, np.where(single, "", given_second))
+
+    # 行号作为邮箱的一部分，保证邮箱唯一
+    emails = _join(SURNAME_PINYIN[surname], ".", index, "@example.com")
+    phones = _join(
+        PHONE_PREFIXES[rng.integers(0, len(PHONE_PREFIXES), size)],
+        np.char.zfill(rng.integers(0, 10 ** 9, size).astype(str), 9),
+    )
+    city = rng.integers(0, len(CITIES), size)
+    addresses = _join(
+        CITIES[city], DISTRICTS[city], ROADS[rng.integers(0, len(ROADS), size)],
+        rng.integers(1, 1000, size), "号",
+    )
+    return {
+        'name': names,
+        'email': emails,
+        'phone': phones,
+        'address': addresses,
+    }
+
+
+def columns_to_instances(model, columns):
+    """把列字典（NumPy 数组或普通列表）转换为模型实例列表"""
+    names = list(columns)
+    values = [
+        columns[name].tolist() if isinstance(columns[name], np.ndarray) else columns[name]
+        for name in names
+    ]
+    return [model(**dict(zip(names, row))) for row in zip(*values)]
+
+
+_BUILDERS = {
+    'category': category_columns,
+    'product': product_columns,
+    'customer': customer_columns,
+}
+
+
+def generate_columns(kind, start, size, seed=DEFAULT_SEED, cache=None, **kwargs):
+    """
+    生成 [start, start + size) 行的列字典
+
+    先生成覆盖这些行的整块，再截取需要的部分。cache 为字典时保存最近生成的一块，
+    连续的小批次不必重复生成同一块。
+    """
+    end = start + size
+    parts = []
+    for block in range(start // BLOCK_SIZE, -(-end // BLOCK_SIZE)):
+        key = (kind, seed, block)
+        if cache is not None and cache.get('key') == key:
+            columns = cache['columns']
+        else:
+            block_start = block * BLOCK_SIZE
+            columns = _BUILDERS[kind](block_start, BLOCK_SIZE, block_rng(seed, kind, block), **kwargs)
+            if cache is not None:
+                cache['key'], cache['columns'] = key, columns
+        offset = block * BLOCK_SIZE
+        low, high = max(start, offset) - offset, min(end, offset + BLOCK_SIZE) - offset
+        parts.append({name: values[low:high] for name, values in columns.items()})
+    if len(parts) == 1:
+        return parts[0]
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+def _column_batches(kind, total, batch_size, seed, start=0, **kwargs):
+    """按批产出列字典"""
+    cache = {}
+    end = start + total
+    for batch_start in range(start, end, batch_size):
+        size = min(batch_size, end - batch_start)
+        yield generate_columns(kind, batch_start, size, seed, cache, **kwargs)
+
+
+def iter_categories(total, batch_size, seed=DEFAULT_SEED, start=0):
+    """逐个产出分类实例（按批生成）"""
+    batches = _column_batches('category', total, batch_size, seed, start)
+    return chain.from_iterable(columns_to_instances(Category, c) for c in batches)
+
+
+def iter_products(total, category_ids, batch_size, seed=DEFAULT_SEED, start=0):
+    """逐个产出产品实例（按批生成）"""
+    category_ids = np.asarray(category_ids)
+    batches = _column_batches(
+        'product', total, batch_size, seed, start,
+        category_ids=category_ids, weights=category_weights(len(category_ids)),
+    )
+    return chain.from_iterable(columns_to_instances(Product, c) for c in batches)
+
+
+def iter_customers(total, batch_size, seed=DEFAULT_SEED, start=0):
+    """逐个产出客户实例（按批生成）"""
+    batches = _column_batches('customer', total, batch_size, seed, start)
+    return chain.from_iterable(columns_to_instances(Customer, c) for c in batches)
@@ -0,0 +1,312 @@
+import os
+import re
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.urls import path
+from django.utils import timezone
+
+from . import cache, importer, stock
+from .exporter import export_data
+from .middleware import QueryBudgetExceeded, query_budget
+from .models import Category, Customer, Product
+from .views import encode_cursor
+
+
+@query_budget(1)
+def two_queries(request):
+    list(Category.objects.all())
+    list(Product.objects.all())
+    return HttpResponse('ok')
+
+
+@query_budget(2)
+def two_queries_within_budget(request):
+    return two_queries(request)
+
+
+# QueryInstrumentationMiddlewareTests 使用的 URL
+urlpatterns = [
+    path('two-queries/', two_queries),
+    path('two-queries-within-budget/', two_queries_within_budget),
+]
+
+
+class ApiTestCase(TestCase):
+    """清空响应缓存：TestCase 不执行 on_commit，版本号不会随测试数据变化而增加"""
+
+    def setUp(self):
+        cache.get_cache().clear()
+        self.category = Category.objects.create(name='电子产品')
+
+    def make_product(self, name, stock_quantity=10, status='available', price='9.90'):
+        return Product.objects.create(
+            name=name, description='', price=Decimal(price), stock_quantity=stock_quantity,
+            status=status, category=self.category,
+        )
+
+
+class StockTests(ApiTestCase):
+
+    def test_reserve_never_oversells(self):
+        product = self.make_product('手机', stock_quantity=5)
+        results = [stock.reserve(product.pk) for _ in range(8)]
+        self.assertEqual(results.count(True), 5)
+        product.refresh_from_db()
+        self.assertEqual(product.stock_quantity, 0)
+        self.assertEqual(product.status, 'out_of_stock')
+
+    def test_reserve_rejects_unavailable_products(self):
+        product = self.make_product('停产手机', status='discontinued')
+        self.assertFalse(stock.reserve(product.pk))
+        product.refresh_from_db()
+        self.assertEqual(product.stock_quantity, 10)
+
+    def test_reserve_many_is_all_or_nothing(self):
+        phone = self.make_product('手机', stock_quantity=5)
+        case = self.make_product('手机壳', stock_quantity=1)
+        self.assertEqual(stock.reserve_many({phone.pk: 2, case.pk: 2}), [case.pk])
+        phone.refresh_from_db()
+        case.refresh_from_db()
+        self.assertEqual((phone.stock_quantity, case.stock_quantity), (5, 1))
+
+        self.assertEqual(stock.reserve_many([(phone.pk, 2), (case.pk, 1), (phone.pk, 3)]), [])
+        phone.refresh_from_db()
+        case.refresh_from_db()
+        self.assertEqual((phone.stock_quantity, phone.status), (0, 'out_of_stock'))
+        self.assertEqual((case.stock_quantity, case.status), (0, 'out_of_stock'))
+
+    def test_release_restocks_out_of_stock_products(self):
+        product = self.make_product('手机', stock_quantity=1)
+        self.assertTrue(stock.reserve(product.pk))
+        self.assertTrue(stock.release(product.pk, 3))
+        product.refresh_from_db()
+        self.assertEqual((product.stock_quantity, product.status), (3, 'available'))
+
+        discontinued = self.make_product('停产手机', stock_quantity=0, status='discontinued')
+        self.assertTrue(stock.release(discontinued.pk))
+        discontinued.refresh_from_db()
+        self.assertEqual(discontinued.status, 'discontinued')
+
+    def test_invalid_quantity(self):
+        product = self.make_product('手机')
+        for quantity in (0, -1, 1.5):
+            with self.assertRaises(ValueError):
+                stock.reserve(product.pk, quantity)
+
+
+class ImportResumeTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(25):
+            self.make_product(f'产品 {i:02d}')
+        Customer.objects.create(name='张三', email='zhang@example.com', address='')
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def crash_after_commit(self, path, batch_size, crash_on):
+        """第 crash_on 批产品提交之后、检查点更新之前中断"""
+        batches = []
+
+        def bump(model, **kwargs):
+            if model is Product:
+                batches.append(model)
+                if len(batches) == crash_on:
+                    raise KeyboardInterrupt
+        with mock.patch.object(importer, 'bump_version', side_effect=bump):
+            with self.assertRaises(KeyboardInterrupt):
+                importer.import_data(path, batch_size=batch_size, verbose=False)
+
+    def test_resume_with_a_different_batch_size(self):
+        for fmt in ('jsonl', 'json'):
+            with self.subTest(fmt=fmt):
+                path = os.path.join(self.directory.name, f'backup.{fmt}')
+                export_data(path, verbose=False)
+                created_at = dict(Product.objects.values_list('name', 'created_at'))
+                Product.objects.all().delete()
+                Customer.objects.all().delete()
+                Category.objects.all().delete()
+
+                self.crash_after_commit(path, batch_size=10, crash_on=2)
+                self.assertEqual(Product.objects.count(), 20)
+                self.assertTrue(os.path.exists(f'{path}.ckpt'))
+
+                imported = importer.import_data(path, batch_size=4, verbose=False)
+                self.assertEqual(imported, {'categories': 0, 'products': 5, 'customers': 1})
+                self.assertEqual(Product.objects.count(), 25)
+                self.assertEqual(dict(Product.objects.values_list('name', 'created_at')), created_at)
+                self.assertFalse(os.path.exists(f'{path}.ckpt'))
+
+
+class KeysetPaginationTests(ApiTestCase):
+
+    def collect(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            ids += [row['id'] for row in data['results']]
+            url = data['next']
+        return ids
+
+    def test_next_cursor_walks_every_row_once(self):
+        products = [self.make_product(f'产品 {i}') for i in range(7)]
+        self.assertEqual(self.collect('/api/products/?limit=3'), [p.pk for p in products])
+
+    def test_updated_at_order(self):
+        products = [self.make_product(f'产品 {i}') for i in range(5)]
+        # 相同的更新时间由 id 决定顺序
+        now = timezone.now()
+        Product.objects.filter(pk__in=[products[1].pk, products[3].pk]).update(updated_at=now)
+        Product.objects.filter(pk=products[0].pk).update(updated_at=now + timedelta(seconds=1))
+        Product.objects.filter(pk__in=[products[2].pk, products[4].pk]).update(updated_at=now - timedelta(seconds=1))
+        expected = [products[i].pk for i in (2, 4, 1, 3, 0)]
+        self.assertEqual(self.collect('/api/products/?order=updated_at&limit=2'), expected)
+
+    def test_bad_cursor(self):
+        self.make_product('手机')
+        for url in (
+            '/api/products/?cursor=!!!',
+            f"/api/products/?cursor={encode_cursor('x')}",
+            f"/api/products/?order=updated_at&cursor={encode_cursor(5)}",
+            f"/api/products/?order=updated_at&cursor={encode_cursor(['not a time', 1])}",
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': '无效的游标'})
+
+
+@override_settings(CHANGEFEED_SAFETY_WINDOW=0)
+class ChangeFeedTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+
+    def changes(self, **params):
+        response = self.client.get('/api/changes/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_requires_staff(self):
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/changes/').status_code, 403)
+
+    def test_resume_from_cursor_and_since(self):
+        old = self.make_product('旧产品')
+        start = timezone.now() - timedelta(minutes=1)
+        Product.objects.filter(pk=old.pk).update(updated_at=start - timedelta(minutes=1))
+        Category.objects.filter(pk=self.category.pk).update(created_at=start - timedelta(minutes=1))
+        new = self.make_product('新产品')
+        Product.objects.filter(pk=new.pk).update(updated_at=start + timedelta(seconds=1))
+
+        data = self.changes(since=start.isoformat())
+        self.assertEqual([(c['model'], c['id']) for c in data['changes']], [('product', new.pk)])
+        self.assertFalse(data['has_more'])
+
+        # 游标之后的新变化（包括删除）
+        old_pk = old.pk
+        old.delete()
+        data = self.changes(cursor=data['cursor'])
+        self.assertEqual([(c['op'], c['id']) for c in data['changes']], [('delete', old_pk)])
+        self.assertEqual(self.changes(cursor=data['cursor'])['changes'], [])
+
+    def test_pages_follow_next(self):
+        products = [self.make_product(f'产品 {i}') for i in range(5)]
+        seen = []
+        data = self.changes(limit=2)
+        while True:
+            seen += [(c['model'], c['id']) for c in data['changes']]
+            if not data['has_more']:
+                break
+            data = self.changes(cursor=data['cursor'], limit=2)
+        self.assertEqual(seen, [('category', self.category.pk)] + [('product', p.pk) for p in products])
+
+    def test_invalid_since_and_cursor(self):
+        self.assertEqual(self.client.get('/api/changes/', {'since': 'yesterday'}).status_code, 400)
+        cursor = encode_cursor({'unknown': ['2026-01-01T00:00:00+00:00', 0]})
+        self.assertEqual(self.client.get('/api/changes/', {'cursor': cursor}).status_code, 400)
+
+
+class ConditionalRequestTests(ApiTestCase):
+
+    def test_if_none_match_returns_304(self):
+        product = self.make_product('手机')
+        for url in ('/api/products/', f'/api/products/{product.pk}/', '/api/categories/'):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                self.assertTrue(etag)
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+
+    def test_etag_changes_after_writes(self):
+        product = self.make_product('手机')
+        list_etag = self.client.get('/api/products/')['ETag']
+        category_etag = self.client.get('/api/categories/')['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.delete()
+        self.assertEqual(self.client.get('/api/products/', HTTP_IF_NONE_MATCH=list_etag).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.name = '数码产品'
+            self.category.save()
+        self.assertEqual(self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=category_etag).status_code, 200)
+
+
+@override_settings(ROOT_URLCONF='sample_data.tests')
+class QueryInstrumentationMiddlewareTests(TestCase):
+
+    @override_settings(QUERY_BUDGET_RAISE=True)
+    def test_over_budget_raises(self):
+        with self.assertLogs('sample_data.queries', 'WARNING'):
+            with self.assertRaisesMessage(QueryBudgetExceeded, '执行了 2 条查询，超出预算 1 条'):
+                self.client.get('/two-queries/')
+
+    @override_settings(QUERY_BUDGET_RAISE=True)
+    def test_within_budget(self):
+        self.assertEqual(self.client.get('/two-queries-within-budget/').status_code, 200)
+
+    @override_settings(QUERY_BUDGET_RAISE=False)
+    def test_over_budget_logs_a_warning(self):
+        with self.assertLogs('sample_data.queries', 'WARNING') as logs:
+            self.assertEqual(self.client.get('/two-queries/').status_code, 200)
+        self.assertIn('"queries": 2', logs.output[0])
+        self.assertIn('"budget": 1', logs.output[0])
+
+    @override_settings(QUERY_TIMING_HEADER=True)
+    def test_server_timing_header(self):
+        header = self.client.get('/two-queries-within-budget/')['Server-Timing']
+        self.assertRegex(header, r'^db;dur=\d+\.\d{2};desc="2 queries", app;dur=\d+\.\d{2}$')
+
+    @override_settings(QUERY_TIMING_HEADER=False)
+    def test_server_timing_header_disabled(self):
+        self.assertNotIn('Server-Timing', self.client.get('/two-queries-within-budget/'))
+
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class QueryBudgetTests(ApiTestCase):
+    """缓存未命中时各接口不超出 @query_budget"""
+
+    def test_api_endpoints(self):
+        product = self.make_product('手机')
+        customer = Customer.objects.create(name='张三', email='zhang@example.com', address='')
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        for url in (
+            '/api/products/', '/api/products/?order=updated_at&status=available',
+            f'/api/products/{product.pk}/', '/api/categories/', f'/api/categories/{self.category.pk}/',
+            '/api/categories/stats/', '/api/customers/', f'/api/customers/{customer.pk}/',
+            '/api/changes/', '/api/cache-stats/',
+        ):
+            with self.subTest(url=url):
+                cache.get_cache().clear()
+                self.assertEqual(self.client.get(url).status_code, 200)
@@ -1,6 +1,35 @@
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
+
+from . import async_views, views
+
+# 异步版本（见 async_views.py），通过 ASGI 部署时使用
+async_api_urlpatterns = [
+    path('products/', async_views.product_list, name='async-product-list'),
+    path('products/count/', async_views.product_count, name='async-product-count'),
+    path('products/<int:pk>/', async_views.product_detail, name='async-product-detail'),
+    path('categories/', async_views.category_list, name='async-category-list'),
+    path('categories/<int:pk>/', async_views.category_detail, name='async-category-detail'),
+    path('categories/<int:pk>/overview/', async_views.category_overview, name='async-category-overview'),
+    path('categories/stats/', async_views.category_stats_list, name='async-category-stats'),
+    path('customers/', async_views.customer_list, name='async-customer-list'),
+    path('customers/<int:pk>/', async_views.customer_detail, name='async-customer-detail'),
+]
+
+api_urlpatterns = [
+    path('products/', views.product_list, name='product-list'),
+    path('products/<int:pk>/', views.product_detail, name='product-detail'),
+    path('categories/', views.category_list, name='category-list'),
+    path('categories/<int:pk>/', views.category_detail, name='category-detail'),
+    path('categories/stats/', views.category_stats_list, name='category-stats'),
+    path('customers/', views.customer_list, name='customer-list'),
+    path('customers/<int:pk>/', views.customer_detail, name='customer-detail'),
+    path('changes/', views.change_feed, name='change-feed'),
+    path('cache-stats/', views.cache_stats, name='cache-stats'),
+    path('async/', include(async_api_urlpatterns)),
+]
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-]
\ No newline at end of file
+    path('api/', include(api_urlpatterns)),
+]
@@ -0,0 +1,380 @@
+"""
+只读 JSON API
+
+列表接口使用游标（keyset）分页：按 (排序字段, id) 取“上一页最后一条之后”的记录，
+而不是 OFFSET，因此翻到多深的页和第一页的代价相同。查询只取需要的列（``.values()``），
+不实例化模型对象。
+
+响应数据按版本化的键缓存（见 cache.py），重复的请求不访问数据库；
+响应头 ``X-Cache`` 标明是否命中缓存。产品和分类接口支持条件请求（见 conditional.py）。
+
+@query_budget 给出每个接口在缓存未命中时的查询次数上限（见 middleware.py），
+测试中开启 QUERY_BUDGET_RAISE，新增的查询（例如 N+1）会让测试失败。
+
+客户接口和变更流包含姓名、邮箱、电话、地址等个人信息，只对已登录的职员开放（@staff_required）；
+缓存统计反映各接口的访问情况，同样只对职员开放。
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
+
+from . import cache, changefeed
+from .conditional import category_condition, product_detail_condition, product_list_condition
+from .middleware import query_budget
+from .models import Category, CategoryStats, Product, Customer
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+CATEGORY_FIELDS = ['id', 'name', 'description', 'created_at']
+PRODUCT_FIELDS = [
+    'id', 'name', 'description', 'price', 'stock_quantity', 'status',
+    'category_id', 'created_at', 'updated_at',
+]
+CUSTOMER_FIELDS = ['id', 'name', 'email', 'phone', 'address', 'date_joined']
+STATS_FIELDS = [
+    'product_count', 'out_of_stock_count', 'stock_value', 'price_total', 'min_price', 'max_price',
+]
+
+PRODUCT_STATUSES = {value for value, _ in Product.STATUS_CHOICES}
+
+
+class ApiJSONEncoder(DjangoJSONEncoder):
+    """保留完整微秒精度的时间（DjangoJSONEncoder 会截断到毫秒）"""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class BadRequest(Exception):
+    pass
+
+
+def api_response(data, status=200):
+    return JsonResponse(data, status=status, encoder=ApiJSONEncoder,
+                        json_dumps_params={'ensure_ascii': False})
+
+
+def cached_response(request, name, models, compute, params=None):
+    """返回缓存的响应数据，未命中时调用 compute()；compute() 返回 None 表示记录不存在"""
+    if params is None:
+        params = '&'.join(sorted(request.GET.urlencode().split('&')))
+    data, hit = cache.get_or_compute(name, models, params, compute)
+    response = api_response(data) if data is not None else not_found()
+    response['X-Cache'] = 'HIT' if hit else 'MISS'
+    return response
+
+
+def error_response(message, status=400):
+    return api_response({'error': message}, status=status)
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, cls=ApiJSONEncoder, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError):
+        raise BadRequest("无效的游标")
+
+
+def get_page_size(request):
+    try:
+        size = int(request.GET.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise BadRequest("limit 必须是整数")
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def keyset_query(request, queryset, fields, order_field='id'):
+    """
+    按 (order_field, id) 做游标分页，返回 (本页的查询集, 页大小)
+
+    多取一条用来判断是否还有下一页，由 keyset_result() 处理。
+    """
+    size = get_page_size(request)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        position = decode_cursor(cursor)
+        if order_field == 'id':
+            if not isinstance(position, int):
+                raise BadRequest("无效的游标")
+            queryset = queryset.filter(id__gt=position)
+        else:
+            try:
+                value, last_id = position
+                value = parse_datetime(value)
+            except (TypeError, ValueError):
+                raise BadRequest("无效的游标")
+            if value is None or not isinstance(last_id, int):
+                raise BadRequest("无效的游标")
+            # 写成 t >= v AND (t > v OR id > last_id)，索引范围扫描即为有序，不需要再排序
+            queryset = queryset.filter(**{f'{order_field}__gte': value}).filter(
+                Q(**{f'{order_field}__gt': value}) | Q(id__gt=last_id)
+            )
+
+    ordering = ['id'] if order_field == 'id' else [order_field, 'id']
+    return queryset.order_by(*ordering).values(*fields)[:size + 1], size
+
+
+def keyset_result(rows, size, order_field='id'):
+    """返回 (记录列表, 下一页游标)"""
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        position = last['id'] if order_field == 'id' else [last[order_field], last['id']]
+        next_cursor = encode_cursor(position)
+    return rows, next_cursor
+
+
+def keyset_page(request, queryset, fields, order_field='id'):
+    """按 (order_field, id) 做游标分页，返回 (记录列表, 下一页游标)"""
+    page, size = keyset_query(request, queryset, fields, order_field)
+    return keyset_result(list(page), size, order_field)
+
+
+def page_data(request, rows, next_cursor):
+    next_url = None
+    if next_cursor:
+        params = request.GET.copy()
+        params['cursor'] = next_cursor
+        next_url = f"{request.path}?{params.urlencode()}"
+    return {'results': rows, 'next': next_url}
+
+
+def attach_category_names(rows):
+    """用一次 IN 查询补上分类名称（不 JOIN，避免大表排序走不了索引）"""
+    ids = {row['category_id'] for row in rows}
+    names = dict(Category.objects.filter(id__in=ids).values_list('id', 'name'))
+    for row in rows:
+        row['category_name'] = names.get(row['category_id'])
+    return rows
+
+
+def filter_products(request, queryset):
+    status = request.GET.get('status')
+    if status:
+        if status not in PRODUCT_STATUSES:
+            raise BadRequest(f"status 必须是 {', '.join(sorted(PRODUCT_STATUSES))} 之一")
+        queryset = queryset.filter(status=status)
+    category = request.GET.get('category')
+    if category:
+        if not category.isdigit():
+            raise BadRequest("category 必须是分类 id")
+        queryset = queryset.filter(category_id=int(category))
+    return queryset
+
+
+def product_list_query(request):
+    """返回 (过滤后的产品查询集, 排序字段)"""
+    order = request.GET.get('order', 'id')
+    if order not in ('id', 'updated_at'):
+        raise BadRequest("order 必须是 id 或 updated_at")
+    return filter_products(request, Product.objects.all()), order
+
+
+def category_stats_queryset():
+    return Category.objects.annotate(
+        **{field: F(f'stats__{field}') for field in STATS_FIELDS}
+    )
+
+
+def handle_bad_request(view):
+    """把 BadRequest 转换为 400 响应"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except BadRequest as e:
+            return error_response(str(e))
+    return wrapper
+
+
+def forbidden():
+    return error_response("需要以职员身份登录", status=403)
+
+
+def _is_staff(user):
+    return user.is_active and user.is_staff
+
+
+def staff_required(view):
+    """只允许已登录的职员访问，否则返回 403；同步和异步视图都适用"""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if not _is_staff(await request.auser()):
+                return forbidden()
+            return await view(request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not _is_staff(request.user):
+            return forbidden()
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def get_row(model, fields, pk):
+    return model.objects.filter(pk=pk).values(*fields).first()
+
+
+def not_found():
+    return error_response("记录不存在", status=404)
+
+
+@query_budget(4)
+@require_GET
+@handle_bad_request
+@product_list_condition
+def product_list(request):
+    """产品列表：?status= &category= 过滤，?order=updated_at 按更新时间分页"""
+    queryset, order = product_list_query(request)
+
+    def compute():
+        rows, next_cursor = keyset_page(request, queryset, PRODUCT_FIELDS, order)
+        return page_data(request, attach_category_names(rows), next_cursor)
+    return cached_response(request, 'product_list', [Product, Category], compute)
+
+
+@query_budget(4)
+@require_GET
+@product_detail_condition
+def product_detail(request, pk):
+    def compute():
+        row = get_row(Product, PRODUCT_FIELDS, pk)
+        return attach_category_names([row])[0] if row is not None else None
+    return cached_response(request, 'product_detail', [Product, Category], compute, str(pk))
+
+
+@query_budget(2)
+@require_GET
+@handle_bad_request
+@category_condition
+def category_list(request):
+    def compute():
+        rows, next_cursor = keyset_page(request, Category.objects.all(), CATEGORY_FIELDS)
+        return page_data(request, rows, next_cursor)
+    return cached_response(request, 'category_list', [Category], compute)
+
+
+@query_budget(2)
+@require_GET
+@category_condition
+def category_detail(request, pk):
+    return cached_response(request, 'category_detail', [Category],
+                           lambda: get_row(Category, CATEGORY_FIELDS, pk), str(pk))
+
+
+def stats_rows(rows):
+    """补上平均价格；没有统计行的分类按 0 个产品处理"""
+    for row in rows:
+        price_total = row.pop('price_total')
+        row['product_count'] = row['product_count'] or 0
+        row['out_of_stock_count'] = row['out_of_stock_count'] or 0
+        row['stock_value'] = row['stock_value'] or 0
+        row['avg_price'] = (
+            round(price_total / row['product_count'], 2) if row['product_count'] else None
+        )
+    return rows
+
+
+@query_budget(1)
+@require_GET
+@handle_bad_request
+def category_stats_list(request):
+    """每个分类的产品汇总（预先计算，见 stats.py）"""
+    queryset = category_stats_queryset()
+
+    def compute():
+        rows, next_cursor = keyset_page(request, queryset, ['id', 'name', *STATS_FIELDS])
+        return page_data(request, stats_rows(rows), next_cursor)
+    return cached_response(request, 'category_stats', [Category, CategoryStats], compute)
+
+
+@query_budget(3)
+@require_GET
+@staff_required
+@handle_bad_request
+def customer_list(request):
+    def compute():
+        rows, next_cursor = keyset_page(request, Customer.objects.all(), CUSTOMER_FIELDS)
+        return page_data(request, rows, next_cursor)
+    return cached_response(request, 'customer_list', [Customer], compute)
+
+
+@query_budget(3)
+@require_GET
+@staff_required
+def customer_detail(request, pk):
+    return cached_response(request, 'customer_detail', [Customer],
+                           lambda: get_row(Customer, CUSTOMER_FIELDS, pk), str(pk))
+
+
+@query_budget(6)
+@require_GET
+@staff_required
+@handle_bad_request
+def change_feed(request):
+    """
+    增量变更流：?since=<ISO 时间> 或 ?cursor=<上次返回的游标>，都不传时从头开始
+
+    响应中的 cursor 总是可以保存下来，下次从这里继续；has_more 为真时 next 是下一页地址。
+    """
+    cursor = request.GET.get('cursor')
+    since = request.GET.get('since')
+    if cursor:
+        positions = decode_cursor(cursor)
+    elif since:
+        try:
+            since = parse_datetime(since)
+        except ValueError:
+            since = None
+        if since is None:
+            raise BadRequest("since 必须是 ISO 8601 时间")
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        positions = changefeed.initial_positions(since)
+    else:
+        positions = {}
+
+    try:
+        changes, positions, has_more = changefeed.read_changes(positions, get_page_size(request))
+    except changefeed.InvalidCursor as e:
+        raise BadRequest(str(e))
+
+    next_cursor = encode_cursor(positions)
+    next_url = None
+    if has_more:
+        params = request.GET.copy()
+        params.pop('since', None)
+        params['cursor'] = next_cursor
+        next_url = f"{request.path}?{params.urlencode()}"
+    return api_response({'changes': changes, 'cursor': next_cursor, 'has_more': has_more, 'next': next_url})
+
+
+@query_budget(2)
+@require_GET
+@staff_required
+def cache_stats(request):
+    """当前进程内各接口的缓存命中统计"""
+    return api_response(cache.cache_stats())